@@ -0,0 +1,113 @@
+"""Overhead of logging on the request hot path, measured offline with transport.ReplayTransport
+
+Run from the repository root: python benchmarks/bench_logging.py [count]
+"""
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import fixtures
+import pywarera
+from pywarera import wareraapi
+from pywarera.transport import ReplayTransport
+
+
+def bench_log_call(count: int):
+    """Cost of one hot-path log message with a batch-sized payload while logging is disabled"""
+    url = f"{wareraapi.API_URL}/company.getById?batch=1"
+    payload = {str(i): {"companyId": f"company{i}"} for i in range(100)}
+    params = {"input": json.dumps(payload)}
+    logger = wareraapi.logger
+    cases = [
+        ("eager f-string", lambda: logger.info(f"Creating request: {url} with params {params}")),
+        ("lazy %-style", lambda: logger.debug("Creating request: %s with params %s", url, params)),
+    ]
+    print(f"{'log call':<28}{'ns/call':>10}")
+    for name, call in cases:
+        start = time.perf_counter()
+        for _ in range(count):
+            call()
+        print(f"{name:<28}{(time.perf_counter() - start) / count * 1e9:>10.0f}")
+
+
+def bench_batch(transport: ReplayTransport, count: int, rounds: int = 7):
+    """Batched companies fetched and cached with logging disabled and with (trace) debug messages written
+    to os.devnull. After a warm-up pass, cases run in rounds in alternating order with the garbage collector off.
+    The fastest round is reported, as other rounds differ by noise much larger than the cost of logging.
+    Records are the log messages written in one round"""
+    logger = wareraapi.logger
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    records = {"count": 0}
+
+    def count_record(record: logging.LogRecord) -> bool:
+        records["count"] += 1
+        return True
+
+    handler.addFilter(count_record)
+    cases = [
+        ("disabled", logging.WARNING, False),
+        ("debug", logging.DEBUG, False),
+        ("debug trace", logging.DEBUG, True),
+    ]
+    ids = [f"company{i}" for i in range(count)]
+
+    def run(level: int, trace: bool) -> float:
+        pywarera.clear_cache()
+        wareraapi.limiter.reset()
+        logger.setLevel(level)
+        wareraapi.DEBUG_TRACE = trace
+        records["count"] = 0
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            pywarera.get_companies(ids)
+            return (time.perf_counter() - start) / count * 1e6
+        finally:
+            gc.enable()
+
+    timings = {name: [] for name, _, _ in cases}
+    record_counts = {}
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for _, level, trace in cases:
+            run(level, trace)  # Warm-up: imports, connection to the cache, memoized keys
+        for round_number in range(rounds):
+            for name, level, trace in (cases if round_number % 2 == 0 else cases[::-1]):
+                timings[name].append(run(level, trace))
+                record_counts[name] = records["count"]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        logger.propagate = True
+        logger.setLevel(logging.NOTSET)
+        wareraapi.DEBUG_TRACE = False
+    print(f"{'batch logging':<28}{'us/item':>10}{'median':>10}{'records':>10}")
+    for name, values in timings.items():
+        print(f"{name:<28}{min(values):>10.1f}{statistics.median(values):>10.1f}{record_counts[name]:>10}")
+
+
+def main(count: int = 1000):
+    logging.basicConfig(level=logging.WARNING)
+    transport = ReplayTransport(fixtures.api())
+    wareraapi.mount_transport(transport)
+    # Disk writes of the SQLite cache vary more between runs than logging costs
+    wareraapi.configure_cache("memory")
+    try:
+        bench_log_call(count * 100)
+        print()
+        bench_batch(transport, count)
+    finally:
+        wareraapi.mount_transport(None)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
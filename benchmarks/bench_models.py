@@ -0,0 +1,76 @@
+"""Construction time and retained memory of models decoded from raw API data
+
+Run from the repository root: python benchmarks/bench_models.py [count]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import fixtures
+from pywarera.classes.Company import Company
+from pywarera.classes.Country import Country
+from pywarera.classes.User import User
+
+
+def touch_user(user: User):
+    user.get_skills()
+    user.skills.get_total_skill_points_spent()
+    return user.dates, user.level, user.wealth
+
+
+def touch_company(company: Company):
+    return company.workers
+
+
+def touch_country(country: Country):
+    return country.rankings.country_wealth
+
+
+def build(model, raw: list[bytes], touch=None) -> list:
+    """Decodes every object from JSON, as responses are, and keeps only the models"""
+    objects = [model(json.loads(data)) for data in raw]
+    if touch is not None:
+        for obj in objects:
+            touch(obj)
+    return objects
+
+
+def measure(model, raw: list[bytes], touch=None) -> tuple[float, float]:
+    """:return: Tuple(microseconds per object, bytes retained per object)
+    Retained memory includes raw data still referenced by the models, and not the JSON bytes themselves"""
+    gc.collect()
+    start = time.perf_counter()
+    build(model, raw, touch)
+    elapsed = time.perf_counter() - start
+    # Memory is measured in a separate run, tracing slows everything down
+    gc.collect()
+    tracemalloc.start()
+    objects = build(model, raw, touch)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return elapsed / len(raw) * 1e6, retained / len(raw)
+
+
+def main(count: int = 20000):
+    cases = [
+        ("User", User, fixtures.user, touch_user),
+        ("Company", Company, fixtures.company, touch_company),
+        ("Country", Country, fixtures.country, touch_country),
+    ]
+    print(f"{'model':<10}{'mode':<10}{'us/obj':>10}{'bytes/obj':>12}")
+    for name, model, factory, touch in cases:
+        raw = [json.dumps(factory(i)).encode() for i in range(count)]
+        for mode, touch_fn in (("built", None), ("accessed", touch)):
+            per_object, retained = measure(model, raw, touch_fn)
+            print(f"{name:<10}{mode:<10}{per_object:>10.2f}{retained:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,82 @@
+"""Throughput of the request and cache hot path, measured offline with transport.ReplayTransport
+
+Run from the repository root: python benchmarks/bench_requests.py [latency in seconds]
+"""
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import fixtures
+import pywarera
+from pywarera import wareraapi
+from pywarera.transport import ReplayTransport
+
+
+def reset(transport: ReplayTransport):
+    pywarera.clear_cache()
+    wareraapi.limiter.reset()
+    transport.requests = 0
+    transport.calls.clear()
+
+
+def bench_cache(transport: ReplayTransport, count: int = 300):
+    """Latency of one request: sent to the API, read from the persistent cache and from the memory cache"""
+    reset(transport)
+    print(f"{'cache':<20}{'us/request':>12}")
+    cases = [
+        ("miss", lambda: None),
+        ("persistent hit", wareraapi.memory_cache.clear),
+        ("memory hit", lambda: None),
+    ]
+    for name, before in cases:
+        before()
+        start = time.perf_counter()
+        for i in range(count):
+            wareraapi.user_get_user_lite(f"user{i}").execute()
+        print(f"{name:<20}{(time.perf_counter() - start) / count * 1e6:>12.0f}")
+
+
+def bench_batch(transport: ReplayTransport, count: int = 1000, limits: tuple[int, ...] = (25, 50, 100, 200)):
+    """Companies per second fetched with BatchSession for different BATCH_LIMIT"""
+    default_limit = wareraapi.BATCH_LIMIT
+    print(f"{'BATCH_LIMIT':<20}{'items/s':>12}{'requests':>10}")
+    try:
+        for limit in limits:
+            reset(transport)
+            wareraapi.BATCH_LIMIT = limit
+            start = time.perf_counter()
+            pywarera.get_companies([f"company{i}" for i in range(count)])
+            elapsed = time.perf_counter() - start
+            print(f"{limit:<20}{count / elapsed:>12.0f}{transport.requests:>10}")
+    finally:
+        wareraapi.BATCH_LIMIT = default_limit
+
+
+def bench_crawl(transport: ReplayTransport):
+    """Citizens of a country and their companies, from an empty cache"""
+    reset(transport)
+    start = time.perf_counter()
+    companies = pywarera.get_country_citizens_companies("country0")
+    elapsed = time.perf_counter() - start
+    print(f"{'crawl':<20}{elapsed:>11.2f}s{transport.requests:>10} requests, {len(companies)} companies")
+
+
+def main(latency: float = 0.02):
+    logging.disable(logging.WARNING)
+    transport = ReplayTransport(fixtures.api(citizens=500), latency=latency)
+    wareraapi.mount_transport(transport)
+    try:
+        bench_cache(transport)
+        print()
+        bench_batch(transport)
+        print()
+        bench_crawl(transport)
+    finally:
+        wareraapi.mount_transport(None)
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.02)
@@ -0,0 +1,58 @@
+"""Offline checks of caching behaviour, run against transport.ReplayTransport
+
+Run from the repository root: python benchmarks/check_cache.py
+"""
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import fixtures
+import pywarera
+from pywarera import wareraapi
+from pywarera.transport import ReplayTransport
+
+
+def check_batch_errors_are_resent():
+    """An error item of a batch is not cached: the next identical batch sends it again, and once the endpoint
+    works its result is returned. Successful items are served from the cache"""
+    api = fixtures.api()
+    mu_fixture = {"_id": "mu1"}
+    transport = ReplayTransport(api)
+    wareraapi.mount_transport(transport)
+    pywarera.clear_cache()
+
+    def send() -> list:
+        with wareraapi.BatchSession() as batch:
+            batch.add(wareraapi.company_get_by_id("company1"))
+            batch.add(wareraapi.mu_get_by_id("mu1"))
+        return batch.responses
+
+    responses = send()
+    assert "error" in responses[1], responses
+    assert transport.calls == {"company.getById": 1, "mu.getById": 1}, transport.calls
+    responses = send()
+    assert "error" in responses[1], responses
+    assert transport.calls == {"company.getById": 1, "mu.getById": 2}, transport.calls
+    api["mu.getById"] = mu_fixture
+    responses = send()
+    assert responses[1]["result"]["data"] == mu_fixture, responses
+    assert transport.calls == {"company.getById": 1, "mu.getById": 3}, transport.calls
+    # Only items are cached, never the batch itself
+    assert len(wareraapi.s.cache.responses) == 2, list(wareraapi.s.cache.responses.keys())
+
+
+def main():
+    logging.disable(logging.WARNING)
+    checks = [check_batch_errors_are_resent]
+    try:
+        for check in checks:
+            check()
+            print(f"{check.__name__:<40}ok")
+    finally:
+        wareraapi.mount_transport(None)
+
+
+if __name__ == "__main__":
+    main()
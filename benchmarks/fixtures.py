@@ -0,0 +1,96 @@
+"""Synthetic API data shaped like real responses, used by benchmarks"""
+
+SKILLS = ["energy", "health", "hunger", "attack", "companies", "entrepreneurship", "production", "criticalChance",
+          "criticalDamages", "armor", "precision", "dodge", "lootChance"]
+SKILL_BARS = ["energy", "health", "hunger", "entrepreneurship", "production"]
+COUNTRY_RANKINGS = ["countryRegionDiff", "countryDamages", "weeklyCountryDamages", "countryDevelopment",
+                    "countryActivePopulation", "countryWealth", "countryProductionBonus"]
+ITEMS = ["limestone", "grain", "livestock", "fish", "iron", "coca", "lead", "petroleum", "concrete", "steel", "bread",
+         "steak", "cookedFish", "lightAmmo", "ammo", "cocain", "oil", "heavyAmmo"]
+
+
+def skill(level: int, bar: bool = False) -> dict:
+    data = {"level": level, "value": level * 10, "weapon": 0, "equipment": 0, "limited": 0, "total": level * 10}
+    if bar:
+        data.update(currentBarValue=50.0, hourlyBarRegen=5.0)
+    return data
+
+
+def user(i: int, country: str = "country0") -> dict:
+    return {
+        "_id": f"user{i}",
+        "username": f"user{i}",
+        "country": country,
+        "isActive": i % 7 != 0,
+        "createdAt": "2025-10-01T00:00:00.000Z",
+        "mu": f"mu{i % 50}",
+        "infos": {"isBanned": i % 97 == 0},
+        "dates": {"lastConnectionAt": "2025-11-01T00:00:00.000Z", "lastNotificationsCheckAt": "2025-11-01T00:00:00.000Z",
+                  "lastCountryMessageCheckAt": "2025-11-01T00:00:00.000Z",
+                  "lastGlobalMessageCheckAt": "2025-11-01T00:00:00.000Z",
+                  "lastEventsCheckAt": "2025-11-01T00:00:00.000Z", "lastWorkOfferApplications": []},
+        "leveling": {"level": 1 + i % 40, "totalXp": i * 13, "dailyXpLeft": 10, "availableSkillPoints": 0,
+                     "spentSkillPoints": 20, "totalSkillPoints": 20, "freeReset": 0},
+        "skills": {name: skill((i + n) % 10, name in SKILL_BARS) for n, name in enumerate(SKILLS)},
+        "rankings": {"userWealth": {"value": i * 3.5, "rank": i, "tier": "gold"},
+                     "userLevel": {"value": 1 + i % 40, "rank": i},
+                     "userReferrals": {"value": 0, "rank": i}},
+    }
+
+
+def company(i: int, region: str = "region0") -> dict:
+    return {
+        "_id": f"company{i}",
+        "user": f"user{i // 3}",
+        "region": region,
+        "itemCode": ITEMS[i % len(ITEMS)],
+        "isFull": False,
+        "name": f"Company {i}",
+        "production": 10 + i % 5,
+        "activeUpgradeLevels": {"automatedEngine": i % 4, "breakRoom": i % 3},
+        "workers": [{"_id": f"worker{i}_{n}", "user": f"user{i + n}", "wage": 5.5 + n} for n in range(i % 4)],
+        "createdAt": "2025-10-01T00:00:00.000Z",
+        "updatedAt": "2025-11-01T00:00:00.000Z",
+        "__v": i % 5,
+        "estimatedValue": 100.0 + i,
+        "dates": {"lastHiresAt": []},
+        "workerCount": i % 4,
+    }
+
+
+def country(i: int) -> dict:
+    return {
+        "_id": f"country{i}",
+        "name": f"Country {i}",
+        "code": f"c{i}",
+        "money": 1000.0 * i,
+        "taxes": {"income": 10, "market": 5, "selfWork": 2},
+        "allies": [],
+        "warsWith": [f"country{i + 1}"],
+        "__v": 1,
+        "strategicResources": {"resources": {}, "bonuses": {"productionPercent": 5, "developmentPercent": 3}},
+        "rankings": {name: {"value": i, "rank": i, "tier": "gold"} for name in COUNTRY_RANKINGS},
+        "updatedAt": "2025-11-01T00:00:00.000Z",
+        "development": 50.0,
+    }
+
+
+def api(citizens: int = 1000, companies_per_user: int = 2) -> dict:
+    """Handlers of endpoints for transport.ReplayTransport. Every country has the same citizens"""
+    def users_by_country(data: dict) -> dict:
+        start = int(data.get("cursor", 0))
+        end = min(start + data.get("limit", 10), citizens)
+        return {"items": [{"_id": f"user{i}"} for i in range(start, end)],
+                "nextCursor": str(end) if end < citizens else None}
+
+    def companies(data: dict) -> dict:
+        i = int(data["userId"][4:])
+        return {"items": [f"company{i * companies_per_user + n}" for n in range(companies_per_user)], "nextCursor": None}
+
+    return {
+        "user.getUsersByCountry": users_by_country,
+        "user.getUserLite": lambda data: user(int(data["userId"][4:])),
+        "company.getCompanies": companies,
+        "company.getById": lambda data: company(int(data["companyId"][7:])),
+        "country.getAllCountries": [country(i) for i in range(10)],
+    }
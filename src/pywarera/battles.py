@@ -0,0 +1,64 @@
+import logging
+from typing import Iterable, Literal
+
+from . import wareraapi
+from .classes.DamageMatrix import DamageMatrix
+from .wareraapi import BatchSession
+
+logger = logging.getLogger(__name__)
+
+battle_sides = Literal["attacker", "defender"]
+subjects = Literal["user", "mu", "country"]
+data_types = Literal["damage", "points", "money"]
+
+
+def get_rankings(battle_ids: Iterable[str], sides: Iterable[battle_sides] = ("attacker", "defender"),
+                 subject: subjects = "user", data_type: data_types = "damage",
+                 skip_errors: bool = False) -> dict[tuple[str, str], list[dict]]:
+    """Fetches rankings of many battles and sides in one batch. Repeated battle IDs are requested once
+    :param skip_errors: Use an empty ranking for a battle side that failed instead of raising WarEraApiException
+    :return: Dict{(battle ID, side): ranking entries}"""
+    keys = [(battle_id, side) for battle_id in dict.fromkeys(battle_ids) for side in sides]
+    with BatchSession() as batch:
+        for battle_id, side in keys:
+            batch.add(wareraapi.battle_ranking_get_ranking(data_type=data_type, type=subject, side=side,
+                                                           battle_id=battle_id))
+    rankings = {}
+    for key, response in zip(keys, batch.responses):
+        try:
+            rankings[key] = _entries(response["result"]["data"])
+        except (KeyError, TypeError) as e:
+            if not skip_errors:
+                raise wareraapi.WarEraApiException(f"Ranking of battle {key[0]} ({key[1]}) failed: {response}") from e
+            logger.warning(f"Skipped broken ranking of battle {key[0]} ({key[1]}): {response}")
+            rankings[key] = []
+    return rankings
+
+
+def _entries(data) -> list[dict]:
+    """Ranking entries as a flat list. Rankings of battles with several rounds come as a list for every round"""
+    if isinstance(data, dict):
+        data = data.get("rankings", data.get("items", []))
+    if data and isinstance(data[0], list):
+        return [entry for round_entries in data for entry in round_entries]
+    return data
+
+
+def get_damage_matrix(battle_ids: Iterable[str], side: battle_sides | None = None, subject: subjects = "user",
+                      data_type: data_types = "damage", skip_errors: bool = False) -> DamageMatrix:
+    """Values of every subject in every battle
+    :param side: Only count one side. Both sides are summed by default
+    :param skip_errors: Count failed rankings as empty instead of raising WarEraApiException"""
+    battle_ids = list(dict.fromkeys(battle_ids))
+    rankings = get_rankings(battle_ids, ("attacker", "defender") if side is None else (side,), subject, data_type,
+                            skip_errors)
+    return DamageMatrix.from_entries(battle_ids, ((battle_id, entry[subject], entry["value"])
+                                                  for (battle_id, _), entries in rankings.items()
+                                                  for entry in entries))
+
+
+def get_participants(battle_id: str, subject: subjects = "user") -> tuple[set[str], set[str]]:
+    """:return: Tuple(IDs of attackers, IDs of defenders)"""
+    rankings = get_rankings([battle_id], subject=subject)
+    return ({entry[subject] for entry in rankings[battle_id, "attacker"]},
+            {entry[subject] for entry in rankings[battle_id, "defender"]})
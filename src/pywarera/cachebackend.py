@@ -0,0 +1,62 @@
+from collections.abc import Iterator, MutableMapping
+
+from requests_cache import BaseCache
+from requests_cache.backends import BaseStorage
+from requests_cache.serializers import SerializerType, pickle_serializer
+
+
+class KeyValueStorage(BaseStorage):
+    """One table of KeyValueCache. Keys are prefixed, so several tables (and several caches) can share one store"""
+
+    def __init__(self, store: MutableMapping, prefix: str, serializer: SerializerType | None = pickle_serializer,
+                 **kwargs):
+        super().__init__(serializer=serializer, **kwargs)
+        self.store: MutableMapping = store
+        self.prefix: str = prefix
+
+    def __getitem__(self, key: str):
+        value = self.store[self.prefix + key]
+        if self.serializer is None and isinstance(value, bytes):
+            value = value.decode()  # Stores like dbm return bytes even for str values
+        return self.deserialize(key, value)
+
+    def __setitem__(self, key: str, value):
+        self.store[self.prefix + key] = self.serialize(value)
+
+    def __delitem__(self, key: str):
+        del self.store[self.prefix + key]
+
+    def __iter__(self) -> Iterator[str]:
+        # Copied first, other processes may write to the store meanwhile
+        for key in list(self.store):
+            if isinstance(key, bytes):
+                key = key.decode()
+            if key.startswith(self.prefix):
+                yield key[len(self.prefix):]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def clear(self):
+        self.bulk_delete(list(self))
+
+
+class KeyValueCache(BaseCache):
+    """Persistent cache in any mapping-like key-value store, e.g. one shared by processes and hosts:
+
+    wareraapi.configure_cache(KeyValueCache(store))
+
+    Responses are pickled, so the store must accept str keys and bytes values, like dbm does.
+    The store is closed together with the cache if it has close()
+    """
+
+    def __init__(self, store: MutableMapping, namespace: str = "wareraapi_cache",
+                 serializer: SerializerType | None = pickle_serializer, **kwargs):
+        super().__init__(cache_name=namespace, **kwargs)
+        self.store: MutableMapping = store
+        self.responses: KeyValueStorage = KeyValueStorage(store, f"{namespace}:responses:", serializer)
+        self.redirects: KeyValueStorage = KeyValueStorage(store, f"{namespace}:redirects:", None)
+
+    def close(self):
+        if hasattr(self.store, "close"):
+            self.store.close()
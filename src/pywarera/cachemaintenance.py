@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import Callable
+
+from requests_cache import BaseCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMaintenance:
+    """Policy for evicting entries of the persistent cache, so that requests never pay for it.
+
+    :param sweep_every: Delete expired entries once per this many requests. None to disable
+    :param sweep_interval: Delete expired entries from a background thread every this many seconds. None to disable
+    :param max_entries: Maximal number of cached responses. Extra entries are evicted on each sweep, the ones closest
+    to expiration first (requests-cache doesn't track access times, so this is how the LRU is approximated).
+    None for no limit
+    """
+
+    def __init__(self, sweep_every: int | None = 1000, sweep_interval: float | None = None, max_entries: int | None = None):
+        self.sweep_every: int | None = sweep_every
+        self.sweep_interval: float | None = sweep_interval
+        self.max_entries: int | None = max_entries
+        self._requests = 0
+        self._counter_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def on_request(self, cache: BaseCache):
+        """Is called on every request, sweeps the cache once per `sweep_every` requests"""
+        if not self.sweep_every:
+            return
+        with self._counter_lock:
+            self._requests += 1
+            if self._requests < self.sweep_every:
+                return
+            self._requests = 0
+        self.sweep(cache, blocking=False)
+
+    def sweep(self, cache: BaseCache, blocking: bool = True):
+        """Deletes expired entries and trims the cache to `max_entries`"""
+        if not self._sweep_lock.acquire(blocking=blocking):
+            return  # Someone is already sweeping
+        try:
+            cache.delete(expired=True)
+            if self.max_entries is not None:
+                self._trim(cache)
+        except Exception as e:
+            logger.warning(f"Cache maintenance failed: {e}")
+        finally:
+            self._sweep_lock.release()
+
+    def _trim(self, cache: BaseCache):
+        excess = len(cache.responses) - self.max_entries
+        if excess <= 0:
+            return
+        if hasattr(cache, "sorted"):  # SQLite backend can sort by expiration on its side
+            oldest = cache.sorted(key="expires", limit=excess)
+        else:
+            oldest = sorted(cache.filter(expired=True), key=lambda r: r.expires_unix or float("inf"))[:excess]
+        cache.delete(*[response.cache_key for response in oldest])
+        logger.info(f"Evicted {excess} entries from the cache")
+
+    def start(self, get_cache: Callable[[], BaseCache]):
+        """Starts background sweeping if `sweep_interval` is set
+        :param get_cache: Returns the cache to sweep. It is called on every sweep, so the cache can be replaced"""
+        if not self.sweep_interval or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                self.sweep(get_cache())
+
+        self._thread = threading.Thread(target=run, name="wareraapi-cache-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
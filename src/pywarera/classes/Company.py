@@ -1,7 +1,13 @@
 from typing import Literal
 
 class Company:
+    __slots__ = ("workers", "id", "user", "region", "item_code", "is_full", "name", "production",
+                 "automated_engine", "break_room", "created_at", "updated_at", "v", "estimated_value", "last_hires_at",
+                 "moved_up_at", "worker_count", "disabled_at")
+
     def __init__(self, data):
+        self.workers: dict[str, tuple[str, float]] | None = {i["_id"]: (i["user"], i["wage"]) for i in data["workers"]} \
+            if data.get("workers", False) else None
         self.id: str | None = data.get("_id")
         self.user: str | None = data.get("user")
         self.region: str | None = data.get("region")
@@ -11,7 +17,6 @@ class Company:
         self.production: float = data.get("production", 0)
         self.automated_engine: int = data["activeUpgradeLevels"]["automatedEngine"]
         self.break_room: int = data["activeUpgradeLevels"].get("breakRoom", 0)
-        self.workers: list[dict] | None = {i["_id"]: (i["user"], i["wage"]) for i in data["workers"]} if data.get("workers", False) else None
         self.created_at = data["createdAt"]
         self.updated_at = data["updatedAt"]
         self.v = data["__v"]
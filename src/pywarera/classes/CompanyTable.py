@@ -0,0 +1,158 @@
+from array import array
+from typing import Iterable, Literal
+
+from .Company import Company
+from .ItemPrices import ItemPrices
+from .Region import Region
+
+group_keys = Literal["region", "item_code", "user"]
+columns = Literal["production", "automated_engine", "break_room", "estimated_value", "worker_count"]
+
+
+class _Categories:
+    """Column of repeating strings stored as indexes into the list of distinct values"""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self.codes: array = array("i")
+        self._indexes: dict[str, int] = {}
+
+    def append(self, value: str):
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(index)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class CompanyTable:
+    """Companies stored column by column in typed arrays. Workers are flattened into a separate edge table,
+    where row i is a worker of the company in row worker_company[i]"""
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.user = _Categories()
+        self.region = _Categories()
+        self.item_code = _Categories()
+        self.production: array = array("d")
+        self.automated_engine: array = array("i")
+        self.break_room: array = array("i")
+        self.estimated_value: array = array("d")
+        self.worker_count: array = array("i")
+        self.is_full: array = array("b")
+        self.disabled: array = array("b")
+        # Workers
+        self.worker_ids: list[str] = []
+        self.worker_company: array = array("i")  # Row of the company
+        self.worker_user: list[str] = []
+        self.worker_wage: array = array("d")
+
+    @classmethod
+    def from_raw(cls, data: Iterable[dict]) -> "CompanyTable":
+        """Builds table straight from API data of companies, without creating Company objects"""
+        table = cls()
+        for row, company in enumerate(data):
+            table.ids.append(company["_id"])
+            table.user.append(company.get("user"))
+            table.region.append(company.get("region"))
+            table.item_code.append(company.get("itemCode"))
+            table.production.append(company.get("production", 0))
+            upgrades = company.get("activeUpgradeLevels", {})
+            table.automated_engine.append(upgrades.get("automatedEngine", 0))
+            table.break_room.append(upgrades.get("breakRoom", 0))
+            table.estimated_value.append(company.get("estimatedValue", 0))
+            table.worker_count.append(company.get("workerCount", 0))
+            table.is_full.append(bool(company.get("isFull")))
+            table.disabled.append(company.get("disabledAt") is not None)
+            for worker in company.get("workers") or []:
+                table.worker_ids.append(worker["_id"])
+                table.worker_company.append(row)
+                table.worker_user.append(worker["user"])
+                table.worker_wage.append(worker["wage"])
+        return table
+
+    @classmethod
+    def from_companies(cls, companies: Iterable[Company]) -> "CompanyTable":
+        """Builds table from Company objects, their workers get built"""
+        table = cls()
+        for row, company in enumerate(companies):
+            table.ids.append(company.id)
+            table.user.append(company.user)
+            table.region.append(company.region)
+            table.item_code.append(company.item_code)
+            table.production.append(company.production)
+            table.automated_engine.append(company.automated_engine)
+            table.break_room.append(company.break_room)
+            table.estimated_value.append(company.estimated_value)
+            table.worker_count.append(company.worker_count)
+            table.is_full.append(bool(company.is_full))
+            table.disabled.append(company.disabled)
+            for worker_id, (user, wage) in (company.workers or {}).items():
+                table.worker_ids.append(worker_id)
+                table.worker_company.append(row)
+                table.worker_user.append(user)
+                table.worker_wage.append(wage)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def group_sum(self, column: columns | array, by: group_keys = "region") -> dict[str, float]:
+        """Sums the column for every region, item code or owner.
+        Column can also be an array with a value for every company, e.g. from get_production_value()"""
+        values = getattr(self, column) if isinstance(column, str) else column
+        keys = getattr(self, by)
+        totals = [0] * len(keys.values)
+        for key, value in zip(keys.codes, values):
+            totals[key] += value
+        return dict(zip(keys.values, totals))
+
+    def group_count(self, by: group_keys = "region") -> dict[str, int]:
+        keys = getattr(self, by)
+        counts = [0] * len(keys.values)
+        for key in keys.codes:
+            counts[key] += 1
+        return dict(zip(keys.values, counts))
+
+    def get_wages(self, by: group_keys = "region") -> dict[str, list[float]]:
+        """Wages of all workers grouped by region, item code or owner of their company"""
+        keys = getattr(self, by)
+        wages = [[] for _ in keys.values]
+        for row, wage in zip(self.worker_company, self.worker_wage):
+            wages[keys.codes[row]].append(wage)
+        return {key: key_wages for key, key_wages in zip(keys.values, wages) if key_wages}
+
+    def get_wage_stats(self, by: group_keys = "region") -> dict[str, tuple[int, float, float, float]]:
+        """:return: Dict{key: Tuple(number of workers, mean wage, min wage, max wage)}"""
+        return {key: (len(wages), sum(wages) / len(wages), min(wages), max(wages))
+                for key, wages in self.get_wages(by).items()}
+
+    def get_prices(self, prices: ItemPrices) -> array:
+        """Market price of the item produced by every company"""
+        item_prices = [prices.get_price_by_code(code) if code else 0 for code in self.item_code.values]
+        return array("d", (item_prices[code] for code in self.item_code.codes))
+
+    def get_production_value(self, prices: ItemPrices, regions: dict[str, Region] | None = None) -> array:
+        """Production of every company multiplied by the price of its item
+        :param regions: If specified, production is increased by deposit bonus of the company's region"""
+        production = self.get_production(regions) if regions is not None else self.production
+        return array("d", map(float.__mul__, production, self.get_prices(prices)))
+
+    def get_production(self, regions: dict[str, Region]) -> array:
+        """Production of every company with deposit bonus of its region applied"""
+        # Bonus for every (region, item) pair that exists in the table is computed once
+        bonuses = {}
+        for region_code, item_code in set(zip(self.region.codes, self.item_code.codes)):
+            region = regions.get(self.region.values[region_code])
+            bonus = 0
+            if region is not None and region.deposit_type == self.item_code.values[item_code]:
+                bonus = region.deposit_production_bonus
+            bonuses[region_code, item_code] = 1 + bonus
+        return array("d", (production * bonuses[key] for production, key in
+                           zip(self.production, zip(self.region.codes, self.item_code.codes))))
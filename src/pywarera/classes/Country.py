@@ -1,7 +1,13 @@
 from .CountryRankings import CountryRankings
 
 class Country:
+    __slots__ = ("rankings", "taxes_income", "taxes_market", "taxes_self_work", "id", "name", "code", "money",
+                 "orgs", "allies", "wars_with", "scheme", "map_accent", "__v", "resources", "production_percent",
+                 "development_percent", "current_battle_order", "updated_at", "development", "discord_url",
+                 "specialized_item", "enemy")
+
     def __init__(self, data):
+        self.rankings: CountryRankings = CountryRankings(data.get("rankings"))
         self.taxes_income: float | None = data.get("taxes", {}).get("income")
         self.taxes_market: float | None = data.get("taxes", {}).get("market")
         self.taxes_self_work: float | None = data.get("taxes", {}).get("selfWork")
@@ -18,7 +24,6 @@ class Country:
         self.resources: dict[str, list[str]] | None = data.get("strategicResources", {}).get("resources")
         self.production_percent: float | None = data.get("strategicResources", {}).get("bonuses", {}).get("productionPercent", 0)
         self.development_percent: float | None = data.get("strategicResources", {}).get("bonuses", {}).get("developmentPercent", 0)
-        self.rankings = CountryRankings(data.get("rankings"))
         self.current_battle_order: str | None = data.get("currentBattleOrder")
         self.updated_at: str = data.get("updatedAt")
         self.development: float | None = data.get("development")
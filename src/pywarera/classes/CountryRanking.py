@@ -1,4 +1,6 @@
 class CountryRanking:
+    __slots__ = ("value", "rank", "tier")
+
     def __init__(self, data):
         self.value = data["value"]
         self.rank = data["rank"]
@@ -1,6 +1,9 @@
 from .CountryRanking import CountryRanking
 
 class CountryRankings:
+    __slots__ = ("country_region_diff", "country_damages", "weekly_country_damages", "country_development",
+                 "country_active_population", "country_wealth", "country_production_bonus")
+
     def __init__(self, data):
         self.country_region_diff = CountryRanking(data["countryRegionDiff"])
         self.country_damages = CountryRanking(data["countryDamages"])
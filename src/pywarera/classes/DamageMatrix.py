@@ -0,0 +1,71 @@
+import heapq
+from array import array
+from typing import Iterable
+
+
+class DamageMatrix:
+    """Dense matrix of values (damage, points or money) with a row for every subject (user, MU or country)
+    and a column for every battle. Values are stored row by row in one typed array"""
+
+    def __init__(self, ids: list[str], battles: list[str], values: array | None = None):
+        self.ids: list[str] = ids
+        self.battles: list[str] = battles
+        self.values: array = values if values is not None else array("d", bytes(8 * len(ids) * len(battles)))
+        self._rows: dict[str, int] = {subject_id: row for row, subject_id in enumerate(ids)}
+        self._columns: dict[str, int] = {battle_id: column for column, battle_id in enumerate(battles)}
+
+    @classmethod
+    def from_entries(cls, battles: list[str], entries: Iterable[tuple[str, str, float]]) -> "DamageMatrix":
+        """Builds matrix from (battle ID, subject ID, value) entries, values of the same cell are summed"""
+        entries = list(entries)
+        ids = list(dict.fromkeys(subject_id for _, subject_id, _ in entries))
+        matrix = cls(ids, battles)
+        width, values, rows, columns = len(battles), matrix.values, matrix._rows, matrix._columns
+        for battle_id, subject_id, value in entries:
+            values[rows[subject_id] * width + columns[battle_id]] += value
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, subject_id: str, battle_id: str) -> float:
+        row, column = self._rows.get(subject_id), self._columns.get(battle_id)
+        if row is None or column is None:
+            return 0
+        return self.values[row * len(self.battles) + column]
+
+    def get_row(self, subject_id: str) -> array:
+        """Values of the subject in every battle"""
+        width = len(self.battles)
+        row = self._rows.get(subject_id)
+        if row is None:
+            return array("d", bytes(8 * width))
+        return self.values[row * width:(row + 1) * width]
+
+    def get_column(self, battle_id: str) -> array:
+        """Values of every subject in the battle"""
+        return self.values[self._columns[battle_id]::len(self.battles)]
+
+    def get_totals(self) -> dict[str, float]:
+        """Sum over all battles for every subject"""
+        width = len(self.battles)
+        values = self.values
+        return {subject_id: sum(values[row * width:(row + 1) * width]) for row, subject_id in enumerate(self.ids)}
+
+    def get_battle_totals(self) -> dict[str, float]:
+        """Sum over all subjects for every battle"""
+        return {battle_id: sum(self.get_column(battle_id)) for battle_id in self.battles}
+
+    def top(self, k: int = 10, battle_id: str | None = None) -> list[tuple[str, float]]:
+        """K subjects with the highest value in the battle or in total
+        :return: List[Tuple(subject ID, value)], the highest first"""
+        if battle_id is None:
+            totals = self.get_totals().items()
+        else:
+            totals = zip(self.ids, self.get_column(battle_id))
+        return heapq.nlargest(k, totals, key=lambda pair: pair[1])
+
+    def to_numpy(self):
+        """Returns matrix as 2D NumPy array sharing memory with it. Requires numpy to be installed"""
+        import numpy
+        return numpy.frombuffer(self.values, dtype=numpy.float64).reshape(len(self.ids), len(self.battles))
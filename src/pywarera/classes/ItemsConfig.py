@@ -1,51 +1,47 @@
+from types import MappingProxyType
+
 from .Item import Item
 
+# Item codes in the order items are stored in
+CODES = ("cookedFish", "heavyAmmo", "steel", "bread", "grain", "limestone", "coca", "concrete", "oil", "lightAmmo",
+         "steak", "livestock", "cocain", "lead", "fish", "petroleum", "ammo", "iron")
+INDEX = MappingProxyType({code: index for index, code in enumerate(CODES)})
+
+
+def _item(code: str) -> property:
+    index = INDEX[code]
+    return property(lambda self: self._items[index])
+
+
 class ItemsConfig:
     def __init__(self, data):
-        self.limestone = Item(data.get("limestone"))
-        self.grain = Item(data.get("grain"))
-        self.livestock = Item(data.get("livestock"))
-        self.fish = Item(data.get("fish"))
-        self.iron = Item(data.get("iron"))
-        self.coca = Item(data.get("coca"))
-        self.mysterious_plant = self.coca
-        self.lead = Item(data.get("lead"))
-        self.petroleum = Item(data.get("petroleum"))
-        self.concrete = Item(data.get("concrete"))
-        self.steel = Item(data.get("steel"))
-        self.bread = Item(data.get("bread"))
-        self.steak = Item(data.get("steak"))
-        self.cooked_fish = Item(data.get("cookedFish"))
-        self.light_ammo = Item(data.get("lightAmmo"))
-        self.ammo = Item(data.get("ammo"))
-        self.cocain = Item(data.get("cocain"))
-        self.pill = self.cocain
-        self.oil = Item(data.get("oil"))
-        self.heavy_ammo = Item(data.get("heavyAmmo"))
+        self._items: tuple[Item, ...] = tuple(Item(data.get(code)) for code in CODES)
+
+    limestone: Item = _item("limestone")
+    grain: Item = _item("grain")
+    livestock: Item = _item("livestock")
+    fish: Item = _item("fish")
+    iron: Item = _item("iron")
+    coca: Item = _item("coca")
+    mysterious_plant: Item = coca
+    lead: Item = _item("lead")
+    petroleum: Item = _item("petroleum")
+    concrete: Item = _item("concrete")
+    steel: Item = _item("steel")
+    bread: Item = _item("bread")
+    steak: Item = _item("steak")
+    cooked_fish: Item = _item("cookedFish")
+    light_ammo: Item = _item("lightAmmo")
+    ammo: Item = _item("ammo")
+    cocain: Item = _item("cocain")
+    pill: Item = cocain
+    oil: Item = _item("oil")
+    heavy_ammo: Item = _item("heavyAmmo")
 
     def get_item_by_code(self, code: str) -> Item:
-        items = self.to_dict()
-        if code in items:
-            return items[code]
+        index = INDEX.get(code)
+        if index is not None:
+            return self._items[index]
 
     def to_dict(self) -> dict[str, Item]:
-        return {
-            "cookedFish": self.cooked_fish,
-            "heavyAmmo": self.heavy_ammo,
-            "steel": self.steel,
-            "bread": self.bread,
-            "grain": self.grain,
-            "limestone": self.limestone,
-            "coca": self.coca,
-            "concrete": self.concrete,
-            "oil": self.oil,
-            "lightAmmo": self.light_ammo,
-            "steak": self.steak,
-            "livestock": self.livestock,
-            "cocain": self.cocain,
-            "lead": self.lead,
-            "fish": self.fish,
-            "petroleum": self.petroleum,
-            "ammo": self.ammo,
-            "iron": self.iron,
-        }
\ No newline at end of file
+        return dict(zip(CODES, self._items))
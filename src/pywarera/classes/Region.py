@@ -2,6 +2,9 @@ from .. import core as pywarera
 from . import Country
 
 class Region:
+    __slots__ = ("id", "is_capital", "is_linked_to_capital", "country", "initial_country", "neighbors", "name",
+                 "main_city", "development", "country_code", "biome", "climate", "resistance", "deposit")
+
     def __init__(self, data):
         self.id: str = data.get("_id")
         self.is_capital: bool = data.get("isCapital")
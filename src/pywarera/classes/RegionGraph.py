@@ -0,0 +1,171 @@
+from array import array
+from collections import deque
+from typing import Iterable
+
+from .Region import Region
+
+
+class RegionGraph:
+    """Map of regions as a graph with integer indexes. Neighbors of region i are
+    targets[offsets[i]:offsets[i + 1]], ownership of regions is kept in country indexes, so graph queries
+    don't touch Region objects or dicts. The map itself never changes, only owners of regions do, see update()"""
+
+    def __init__(self, regions: Iterable[Region]):
+        regions = list(regions)
+        self.ids: list[str] = [region.id for region in regions]
+        self.index: dict[str, int] = {region_id: i for i, region_id in enumerate(self.ids)}
+        self.offsets: array = array("i", [0])
+        self.targets: array = array("i")
+        for region in regions:
+            self.targets.extend(self.index[neighbor] for neighbor in region.neighbors or [] if neighbor in self.index)
+            self.offsets.append(len(self.targets))
+        self.is_capital: array = array("b", (bool(region.is_capital) for region in regions))
+        self.countries: list[str] = []  # Every distinct country ID once
+        self._country_index: dict[str, int] = {}
+        self.members: list[set[int]] = []  # Country index -> indexes of its regions
+        self.country: array = array("i", (self._get_country_index(region.country) for region in regions))
+        for i, country in enumerate(self.country):
+            self.members[country].add(i)
+        self._linked: dict[int, set[int]] = {}  # Country index -> its regions linked to its capital
+
+    @classmethod
+    def from_raw(cls, data: dict[str, dict]) -> "RegionGraph":
+        """Builds graph from the response of region_get_regions_object()"""
+        return cls(Region(region) for region in data.values())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _get_country_index(self, country_id: str) -> int:
+        index = self._country_index.get(country_id)
+        if index is None:
+            index = self._country_index[country_id] = len(self.countries)
+            self.countries.append(country_id)
+            self.members.append(set())
+        return index
+
+    def _neighbors(self, i: int) -> array:
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def get_neighbors(self, region_id: str) -> list[str]:
+        return [self.ids[j] for j in self._neighbors(self.index[region_id])]
+
+    def get_country(self, region_id: str) -> str:
+        return self.countries[self.country[self.index[region_id]]]
+
+    def get_country_regions(self, country_id: str) -> list[str]:
+        country = self._country_index.get(country_id)
+        return [] if country is None else [self.ids[i] for i in sorted(self.members[country])]
+
+    def update(self, regions: Iterable[Region]) -> list[str]:
+        """Applies owners of the regions to the graph, only changed regions are touched
+        :return: IDs of regions that changed their owner"""
+        changed = []
+        for region in regions:
+            i = self.index.get(region.id)
+            if i is not None and self.countries[self.country[i]] != region.country:
+                self.set_country(region.id, region.country)
+                changed.append(region.id)
+        return changed
+
+    def update_raw(self, data: dict[str, dict]) -> list[str]:
+        """Same as update(), but with the response of region_get_regions_object()"""
+        changed = []
+        for region_id, region in data.items():
+            i = self.index.get(region_id)
+            if i is not None and self.countries[self.country[i]] != region.get("country"):
+                self.set_country(region_id, region.get("country"))
+                changed.append(region_id)
+        return changed
+
+    def set_country(self, region_id: str, country_id: str):
+        i = self.index[region_id]
+        old, new = self.country[i], self._get_country_index(country_id)
+        self.members[old].discard(i)
+        self.members[new].add(i)
+        self.country[i] = new
+        # Linkage to capital can change only for the two countries
+        self._linked.pop(old, None)
+        self._linked.pop(new, None)
+
+    def get_distances(self, start: str, max_depth: int | None = None, country_id: str | None = None) -> dict[str, int]:
+        """Number of steps from the start region to every reachable region
+        :param country_id: Only go through regions of this country"""
+        allowed = None if country_id is None else self.members[self._country_index[country_id]]
+        distances = self._bfs([self.index[start]], allowed, max_depth)
+        return {self.ids[i]: distance for i, distance in distances.items()}
+
+    def get_path(self, start: str, end: str, country_ids: Iterable[str] | None = None) -> list[str] | None:
+        """Shortest path between two regions including both of them, None if there is no path
+        :param country_ids: Only go through regions of these countries"""
+        allowed = None
+        if country_ids is not None:
+            allowed = set()
+            for country_id in country_ids:
+                if country_id in self._country_index:
+                    allowed |= self.members[self._country_index[country_id]]
+        source, target = self.index[start], self.index[end]
+        parents = {source: -1}
+        queue = deque([source])
+        while queue:
+            i = queue.popleft()
+            if i == target:
+                path = []
+                while i != -1:
+                    path.append(self.ids[i])
+                    i = parents[i]
+                return path[::-1]
+            for j in self._neighbors(i):
+                if j not in parents and (allowed is None or j in allowed or j == target):
+                    parents[j] = i
+                    queue.append(j)
+        return None
+
+    def _bfs(self, starts: list[int], allowed: set[int] | None = None, max_depth: int | None = None) -> dict[int, int]:
+        distances = {i: 0 for i in starts}
+        queue = deque(starts)
+        while queue:
+            i = queue.popleft()
+            depth = distances[i] + 1
+            if max_depth is not None and depth > max_depth:
+                continue
+            for j in self._neighbors(i):
+                if j not in distances and (allowed is None or j in allowed):
+                    distances[j] = depth
+                    queue.append(j)
+        return distances
+
+    def get_frontier(self, country_id: str, enemy_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Regions of the country that border regions of its enemies, e.g. of Country.wars_with
+        :return: Dict{region ID: IDs of bordering enemy regions}"""
+        country = self._country_index.get(country_id)
+        enemies = {self._country_index[enemy_id] for enemy_id in enemy_ids if enemy_id in self._country_index}
+        if country is None or not enemies:
+            return {}
+        frontier = {}
+        for i in sorted(self.members[country]):
+            enemy_neighbors = [self.ids[j] for j in self._neighbors(i) if self.country[j] in enemies]
+            if enemy_neighbors:
+                frontier[self.ids[i]] = enemy_neighbors
+        return frontier
+
+    def get_linked_to_capital(self, country_id: str) -> set[str]:
+        """Regions of the country connected to its capital through its own regions"""
+        return {self.ids[i] for i in self._get_linked(self._country_index[country_id])}
+
+    def get_unlinked_from_capital(self, country_id: str) -> set[str]:
+        country = self._country_index[country_id]
+        linked = self._get_linked(country)
+        return {self.ids[i] for i in self.members[country] if i not in linked}
+
+    def is_linked_to_capital(self, region_id: str) -> bool:
+        i = self.index[region_id]
+        return i in self._get_linked(self.country[i])
+
+    def _get_linked(self, country: int) -> set[int]:
+        linked = self._linked.get(country)
+        if linked is None:
+            members = self.members[country]
+            capitals = [i for i in members if self.is_capital[i]]
+            linked = self._linked[country] = set(self._bfs(capitals, members))
+        return linked
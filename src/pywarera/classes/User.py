@@ -5,17 +5,21 @@ from .UserRankings import UserRankings
 from typing import Literal
 
 class User:
+    __slots__ = ("dates", "leveling", "skills", "rankings", "is_banned", "id", "username", "country", "is_active",
+                 "created_at", "mu")
+
     def __init__(self, data):
-        self.dates = UserDates(data["dates"])
+        # Sections are built right away: with __slots__ they take less memory than the raw dicts they come from
+        self.dates: UserDates = UserDates(data["dates"])
+        self.leveling: UserLeveling = UserLeveling(data["leveling"])
+        self.skills: UserSkills = UserSkills(data["skills"])
+        self.rankings: UserRankings | None = UserRankings(data["rankings"]) if data.get("rankings") else None
         self.is_banned: bool = data.get("infos", {}).get("isBanned", False)
-        self.leveling = UserLeveling(data["leveling"])
         self.id: str = data["_id"]
         self.username: str = data["username"]
         self.country: str = data["country"]
         self.is_active: bool = data["isActive"]
-        self.skills = UserSkills(data["skills"])
         self.created_at: str = data["createdAt"]
-        self.rankings = UserRankings(data["rankings"]) if data.get("rankings") else None
         self.mu: str = data.get("mu")
 
     @property
@@ -33,19 +37,20 @@ class User:
                             "energy", "health", "hunger", "attack", "companies", "entrepreneurship",
                             "production", "critical_chance", "critical_damages", "armor", "precision",
                             "dodge", "loot_chance"], int]:
+        skills = self.skills
         result = {
-            "energy": self.skills.energy.level,
-            "health": self.skills.health.level,
-            "hunger": self.skills.hunger.level,
-            "attack": self.skills.attack.level,
-            "companies": self.skills.companies.level,
-            "entrepreneurship": self.skills.entrepreneurship.level,
-            "production": self.skills.production.level,
-            "critical_chance": self.skills.critical_chance.level,
-            "critical_damages": self.skills.critical_damages.level,
-            "armor": self.skills.armor.level,
-            "precision": self.skills.precision.level,
-            "dodge": self.skills.dodge.level,
-            "loot_chance": self.skills.loot_chance.level
+            "energy": skills.energy.level,
+            "health": skills.health.level,
+            "hunger": skills.hunger.level,
+            "attack": skills.attack.level,
+            "companies": skills.companies.level,
+            "entrepreneurship": skills.entrepreneurship.level,
+            "production": skills.production.level,
+            "critical_chance": skills.critical_chance.level,
+            "critical_damages": skills.critical_damages.level,
+            "armor": skills.armor.level,
+            "precision": skills.precision.level,
+            "dodge": skills.dodge.level,
+            "loot_chance": skills.loot_chance.level
         }
         return result
\ No newline at end of file
@@ -1,4 +1,8 @@
 class UserDates:
+    __slots__ = ("last_connection_at", "last_notification_check_at", "last_country_message_check_at",
+                 "last_global_message_check_at", "last_events_check_at", "last_work_offer_applications", "last_work_at",
+                 "last_skills_reset_at")
+
     def __init__(self, data):
         self.last_connection_at = data["lastConnectionAt"]
         self.last_notification_check_at = data["lastNotificationsCheckAt"]
@@ -1,4 +1,7 @@
 class UserLeveling:
+    __slots__ = ("level", "total_xp", "daily_xp_left", "available_skill_points", "spent_skill_points",
+                 "total_skill_points", "free_reset")
+
     def __init__(self, data):
         self.level = data["level"]
         self.total_xp = data["totalXp"]
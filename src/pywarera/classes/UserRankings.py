@@ -1,6 +1,8 @@
 from .UserRanking import UserRanking
 
 class UserRankings:
+    __slots__ = ("user_wealth", "user_level", "user_referrals")
+
     def __init__(self, data):
         self.user_wealth = UserRanking(data["userWealth"])
         self.user_level = UserRanking(data["userLevel"])
@@ -1,4 +1,7 @@
 class UserSkill:
+    __slots__ = ("level", "ammo_percent", "buffs_percent", "debuffs_percent", "value", "weapon", "equipment", "limited",
+                 "total")
+
     def __init__(self, data):
         self.level: int = data["level"]
         self.ammo_percent: int | None = data.get("ammoPercent", None)
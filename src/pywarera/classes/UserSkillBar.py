@@ -1,6 +1,8 @@
 from .UserSkill import UserSkill
 
 class UserSkillBar(UserSkill):
+    __slots__ = ("current_bar_value", "hourly_bar_regen")
+
     def __init__(self, data):
         super().__init__(data)
         self.current_bar_value: float = data["currentBarValue"]
@@ -2,6 +2,9 @@ from .UserSkill import UserSkill
 from .UserSkillBar import UserSkillBar
 
 class UserSkills:
+    __slots__ = ("energy", "health", "hunger", "attack", "companies", "entrepreneurship", "production", "critical_chance",
+                 "critical_damages", "armor", "precision", "dodge", "loot_chance")
+
     def __init__(self, data):
         self.energy: UserSkillBar = UserSkillBar(data["energy"])
         self.health: UserSkillBar = UserSkillBar(data["health"])
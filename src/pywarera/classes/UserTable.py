@@ -0,0 +1,164 @@
+from array import array
+from typing import Callable, Iterable, Literal
+
+from .User import User
+
+# Skill name -> key of the skill in API data
+SKILLS: dict[str, str] = {
+    "energy": "energy",
+    "health": "health",
+    "hunger": "hunger",
+    "attack": "attack",
+    "companies": "companies",
+    "entrepreneurship": "entrepreneurship",
+    "production": "production",
+    "critical_chance": "criticalChance",
+    "critical_damages": "criticalDamages",
+    "armor": "armor",
+    "precision": "precision",
+    "dodge": "dodge",
+    "loot_chance": "lootChance",
+}
+SKILL_BARS = ("energy", "health", "hunger", "entrepreneurship", "production")
+# Same groups as in UserSkills.get_total_skill_points_spent_groups()
+ECONOMY_SKILLS = ("energy", "companies", "entrepreneurship", "production", "loot_chance")
+MILITARY_SKILLS = ("health", "hunger", "attack", "critical_chance", "critical_damages", "armor", "dodge")
+
+columns = Literal["level", "wealth", "is_active", "is_banned"]
+
+
+class UserTable:
+    """Users stored column by column in typed arrays, for analytics over many users at once.
+    Row i of every column belongs to the user ids[i]"""
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.countries: list[str] = []  # Every distinct country ID once
+        self.country: array = array("i")  # Index in self.countries
+        self.level: array = array("i")
+        self.wealth: array = array("d")
+        self.is_active: array = array("b")
+        self.is_banned: array = array("b")
+        self.skills: dict[str, array] = {name: array("i") for name in SKILLS}  # Skill levels
+        self.bars: dict[str, array] = {name: array("d") for name in SKILL_BARS}  # Current bar values
+
+    @classmethod
+    def from_raw(cls, data: Iterable[dict]) -> "UserTable":
+        """Builds table straight from API data of users, without creating User objects"""
+        table = cls()
+        country_indexes = {}
+        for user in data:
+            table._add_country(user["country"], country_indexes)
+            table.ids.append(user["_id"])
+            table.level.append(user["leveling"]["level"])
+            rankings = user.get("rankings")
+            table.wealth.append(rankings["userWealth"]["value"] if rankings else 0)
+            table.is_active.append(bool(user["isActive"]))
+            table.is_banned.append(bool(user.get("infos", {}).get("isBanned", False)))
+            skills = user["skills"]
+            for name, key in SKILLS.items():
+                table.skills[name].append(skills[key]["level"])
+            for name in SKILL_BARS:
+                table.bars[name].append(skills[SKILLS[name]].get("currentBarValue", 0))
+        return table
+
+    @classmethod
+    def from_users(cls, users: Iterable[User]) -> "UserTable":
+        """Builds table from User objects, their leveling, skills and rankings sections get built"""
+        table = cls()
+        country_indexes = {}
+        for user in users:
+            table._add_country(user.country, country_indexes)
+            table.ids.append(user.id)
+            table.level.append(user.level)
+            table.wealth.append(user.wealth)
+            table.is_active.append(bool(user.is_active))
+            table.is_banned.append(bool(user.is_banned))
+            skills = user.skills
+            for name in SKILLS:
+                table.skills[name].append(getattr(skills, name).level)
+            for name in SKILL_BARS:
+                table.bars[name].append(getattr(skills, name).current_bar_value)
+        return table
+
+    def _add_country(self, country: str, country_indexes: dict[str, int]):
+        if country not in country_indexes:
+            country_indexes[country] = len(self.countries)
+            self.countries.append(country)
+        self.country.append(country_indexes[country])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def country_of(self, index: int) -> str:
+        return self.countries[self.country[index]]
+
+    def get_skills(self, index: int) -> dict[str, int]:
+        """Same as User.get_skills() for the user in the row"""
+        return {name: column[index] for name, column in self.skills.items()}
+
+    def get_skill_points_spent(self, skill: str) -> array:
+        """Skill points spent on the skill by every user"""
+        return array("d", (level * (level + 1) / 2 for level in self.skills[skill]))
+
+    def get_total_skill_points_spent_groups(self) -> tuple[array, array]:
+        """Same as UserSkills.get_total_skill_points_spent_groups() for every user at once
+        :return: Tuple(economy skill points, military skill points)"""
+        return self._sum_columns(ECONOMY_SKILLS), self._sum_columns(MILITARY_SKILLS)
+
+    def get_total_skill_points_spent(self) -> array:
+        economy, military = self.get_total_skill_points_spent_groups()
+        return array("d", map(float.__add__, economy, military))
+
+    def _sum_columns(self, skills: Iterable[str]) -> array:
+        return array("d", map(sum, zip(*(self.get_skill_points_spent(skill) for skill in skills))))
+
+    def mask(self, column: columns | str, predicate: Callable) -> list[bool]:
+        """Mask of rows for filter(), e.g. table.mask("level", lambda level: level >= 20).
+        Skill names can be used as columns too"""
+        values = self._column(column)
+        return [bool(predicate(value)) for value in values]
+
+    def _column(self, column: str) -> array:
+        return self.skills[column] if column in self.skills else getattr(self, column)
+
+    def filter(self, mask: Iterable[bool]) -> "UserTable":
+        """Returns new table only with rows where mask is True"""
+        rows = [index for index, keep in enumerate(mask) if keep]
+        table = UserTable()
+        table.ids = [self.ids[i] for i in rows]
+        table.countries = list(self.countries)
+        for name in ("country", "level", "wealth", "is_active", "is_banned"):
+            column = getattr(self, name)
+            setattr(table, name, array(column.typecode, (column[i] for i in rows)))
+        table.skills = {name: array("i", (column[i] for i in rows)) for name, column in self.skills.items()}
+        table.bars = {name: array("d", (column[i] for i in rows)) for name, column in self.bars.items()}
+        return table
+
+    def group_sum(self, column: columns | str, by: Literal["country", "level"] = "country") -> dict:
+        """Sums the column (or skill) for every country or level"""
+        values = self._column(column)
+        keys = self.country if by == "country" else self.level
+        totals = {}
+        for key, value in zip(keys, values):
+            totals[key] = totals.get(key, 0) + value
+        if by == "country":
+            return {self.countries[key]: total for key, total in totals.items()}
+        return totals
+
+    def group_count(self, by: Literal["country", "level"] = "country") -> dict:
+        counts = {}
+        for key in (self.country if by == "country" else self.level):
+            counts[key] = counts.get(key, 0) + 1
+        if by == "country":
+            return {self.countries[key]: count for key, count in counts.items()}
+        return counts
+
+    def level_histogram(self) -> dict[int, int]:
+        return dict(sorted(self.group_count(by="level").items()))
+
+    def to_numpy(self, column: columns | str):
+        """Returns the column (or skill) as NumPy array sharing memory with the table. Requires numpy to be installed"""
+        import numpy
+        values = self._column(column)
+        return numpy.frombuffer(values, dtype=numpy.dtype(values.typecode))
@@ -1,24 +1,39 @@
 import logging
 
-from . import wareraapi
+from . import battles, wareraapi
 from .classes.User import User
+from .classes.UserTable import UserTable
 from .classes.Country import Country
 from .classes.Company import Company
+from .classes.CompanyTable import CompanyTable
+from .classes.DamageMatrix import DamageMatrix
 from .classes.Government import Government
 from .classes.MilitaryUnit import MilitaryUnit
 from .classes.ItemPrices import ItemPrices
 from .classes.Region import Region
+from .classes.RegionGraph import RegionGraph
 from .classes.GameConfig import GameConfig
 from .classes.Item import Item
+from .live import LiveBattleFeed, LiveUpdate, watch_battles
+from .pipeline import Pipeline
+from .production import ProductionEngine
+from .snapshot import WorldSnapshot, take_world_snapshot
+from .store import EntityStore
+from .sync import ChangeEvent, ChangeTracker
 from .wareraapi import BatchSession
-from typing import Literal
+from typing import Iterator, Literal
 
 countries = dict()
 
+# Name -> (raw response, model built from it). Models are rebuilt only when the cached response changes
+_parsed_responses: dict[str, tuple] = dict()
+
 logger = logging.getLogger(__name__)
 
 
 def clear_cache():
+    _parsed_responses.clear()
+    wareraapi.memory_cache.clear()
     wareraapi.s.cache.clear()
 
 
@@ -26,8 +41,16 @@ def update_api_token(new_api_token):
     wareraapi.update_api_token(new_api_token)
 
 
+def _parse_once(name: str, raw, parse):
+    """Returns model built from the raw response, reusing the previous one while the response is the same cached object"""
+    parsed = _parsed_responses.get(name)
+    if parsed is None or parsed[0] is not raw:
+        parsed = _parsed_responses[name] = (raw, parse(raw))
+    return parsed[1]
+
+
 def get_items():
-    return GameConfig(wareraapi.game_config_get_game_config().execute()).items
+    return _parse_once("game_config", wareraapi.game_config_get_game_config().execute(), GameConfig).items
 
 
 def get_item(item_code: str) -> Item:
@@ -36,36 +59,73 @@ def get_item(item_code: str) -> Item:
 
 def get_user_wage(user_id, cursor=None):
     wage = 0
-    wage_transactions = wareraapi.transaction_get_paginated_transactions(limit=20, user_id=user_id, transaction_type="wage", cursor=cursor).execute()
-    if len(wage_transactions[0]) > 0:
-        for transaction in wage_transactions[0]:
+    wage_transactions = wareraapi.transaction_get_paginated_transactions(limit=20, user_id=user_id, transaction_type="wage", cursor=cursor)
+    for transactions in wage_transactions.iter_pages():
+        for transaction in transactions:
             if transaction["sellerId"] == user_id:
                 wage = transaction["money"] / transaction["quantity"]
-        if wage == 0:
-            wage = get_user_wage(user_id, wage_transactions[1])
+        if wage != 0:
+            break
     return wage
 
 
 def get_trading_prices() -> ItemPrices:
-    return ItemPrices(wareraapi.item_trading_get_prices().execute())
+    return _parse_once("prices", wareraapi.item_trading_get_prices().execute(), ItemPrices)
 
 
 def get_item_price(item_code: str) -> float:
     return get_trading_prices().get_price_by_code(item_code)
 
 
+def get_item_prices(item_codes: list[str]) -> list[float]:
+    return get_trading_prices().get_prices(item_codes)
+
+
+def get_production_engine(point_value: float | None = None) -> ProductionEngine:
+    """Production chains of all items evaluated with current prices. The dependency graph is built once per game
+    config, every point_value gets its own engine. When prices change a new engine is returned, with only affected
+    items evaluated again, engines returned before are never changed
+    :param point_value: Money value of one production point, e.g. a wage. None for the market value"""
+    graph = _parse_once("production", get_items(), ProductionEngine)
+    prices = get_trading_prices()
+    engines = _parse_once("production_engines", graph, lambda _: {})
+    engine = engines.get(point_value)
+    if engine is None or engine.prices is not prices:
+        engine = engines[point_value] = (engine or graph).evaluated(prices, point_value)
+    return engine
+
+
 def get_region(region_id: str) -> Region:
-    return Region(wareraapi.region_get_regions_object().execute()[region_id])
+    return get_regions()[region_id]
+
+
+def get_regions() -> dict[str, Region]:
+    return _parse_once("regions", wareraapi.region_get_regions_object().execute(),
+                       lambda raw: {region_id: Region(region) for region_id, region in raw.items()})
+
+
+def get_region_graph() -> RegionGraph:
+    """Graph of all regions. It is built once, later calls only apply changed owners of regions"""
+    raw = wareraapi.region_get_regions_object().execute()
+    parsed = _parsed_responses.get("region_graph")
+    if parsed is None:
+        parsed = _parsed_responses["region_graph"] = (raw, RegionGraph.from_raw(raw))
+    elif parsed[0] is not raw:
+        parsed[1].update_raw(raw)
+        _parsed_responses["region_graph"] = (raw, parsed[1])
+    return parsed[1]
 
 
 def get_user(user_id: str) -> User:
     return User(wareraapi.user_get_user_lite(user_id).execute())
 
 
-def get_users(users_ids: list[str]) -> list[User]:
+def get_users(users_ids: list[str], as_table: bool = False) -> list[User] | UserTable:
     with BatchSession() as batch:
         for user_id in users_ids:
             batch.add(wareraapi.user_get_user_lite(user_id))
+    if as_table:
+        return UserTable.from_raw(user_data["result"]["data"] for user_data in batch.responses)
     return [User(user_data["result"]["data"]) for user_data in batch.responses]
 
 
@@ -95,17 +155,33 @@ def get_country_id_by_name(country_name: str) -> str:
 
 
 def get_country_citizens_ids(country_id: str) -> list[str]:
-    to_return = []
-    cursor = ""
-    while cursor is not None:
-        items, cursor = wareraapi.user_get_users_by_country(country_id, limit=100, cursor=cursor).execute()
-        to_return.extend([item["_id"] for item in items])
-    return to_return
+    return [item["_id"] for item in wareraapi.user_get_users_by_country(country_id, limit=100).iter_items(prefetch=True)]
 
 
-def get_country_citizens(country_id: str) -> list[User]:
+def get_country_citizens(country_id: str, as_table: bool = False) -> list[User] | UserTable:
     ids = get_country_citizens_ids(country_id)
-    return get_users(ids)
+    return get_users(ids, as_table)
+
+
+def stream_country_citizens(country_id: str, with_users: bool = True, with_companies: bool = False,
+                            queue_size: int = 4) -> Iterator[User | Company]:
+    """Crawls citizens of a country and/or their companies as a pipeline: every page of citizen ids is fetched
+    as users and companies while next pages are still being paginated. Results are yielded as soon as they're ready,
+    so their order is not guaranteed
+    :param queue_size: How many pages each stage can get ahead of the next one
+    """
+    pipeline = Pipeline(queue_size)
+    user_pages, company_pages = pipeline.queue(), pipeline.queue()
+    pipeline.source(([item["_id"] for item in page] for page in
+                     wareraapi.user_get_users_by_country(country_id, limit=100).iter_pages(prefetch=True)),
+                    [user_pages] * with_users + [company_pages] * with_companies)
+    if with_users:
+        pipeline.stage(user_pages, get_users, [pipeline.output])
+    if with_companies:
+        company_ids = pipeline.queue()
+        pipeline.stage(company_pages, lambda ids: [get_users_company_ids(ids)], [company_ids])
+        pipeline.stage(company_ids, get_companies, [pipeline.output])
+    yield from pipeline
 
 
 def get_country_citizen_ids_by_name(country_name: str) -> list[str]:
@@ -144,16 +220,18 @@ def get_company(company_id: str) -> Company:
     return Company(wareraapi.company_get_by_id(company_id))
 
 
-def get_companies(company_ids: list[str]) -> list[Company]:
+def get_companies(company_ids: list[str], as_table: bool = False) -> list[Company] | CompanyTable:
     with BatchSession() as batch:
         for company_id in company_ids:
             batch.add(wareraapi.company_get_by_id(company_id))
+    if as_table:
+        return CompanyTable.from_raw(response["result"]["data"] for response in batch.responses)
     return [Company(response["result"]["data"]) for response in batch.responses]
 
 
-def get_country_citizens_companies(country_id: str) -> list[Company]:
-    company_ids = get_country_citizens_company_ids(country_id)
-    return get_companies(company_ids)
+def get_country_citizens_companies(country_id: str, as_table: bool = False) -> list[Company] | CompanyTable:
+    companies = list(stream_country_citizens(country_id, with_users=False, with_companies=True))
+    return CompanyTable.from_companies(companies) if as_table else companies
 
 
 def get_user_companies(user_id: str) -> list[Company]:
@@ -173,27 +251,14 @@ def get_military_units_from_paginated(items: list) -> tuple[MilitaryUnit]:
 
 
 def get_users_in_battle_id(battle_id: str, subject: Literal["user", "mu", "country"] = "user") -> tuple[set, set]:
-    items_attackers = wareraapi.battle_ranking_get_ranking(type=subject, data_type="damage", battle_id=battle_id, side="attacker").execute()
-    items_defenders = wareraapi.battle_ranking_get_ranking(type=subject, data_type="damage", battle_id=battle_id, side="defender").execute()
-    items_attackers = set([i[subject] for i in [k for k in items_attackers]] if type(items_attackers) == list else [i[subject] for i in items_attackers])
-    items_defenders = set([i[subject] for i in [k for k in items_defenders]] if type(items_defenders) == list else [i[subject] for i in items_defenders])
-    return items_attackers, items_defenders
+    return battles.get_participants(battle_id, subject)
 
 
 def get_damage_in_battles(battle_id: str | list, side: Literal["attacker", "defender"]):
-    if isinstance(battle_id, str):
-        data = wareraapi.battle_ranking_get_ranking(type="user", data_type="damage", battle_id=battle_id, side=side).execute()
-    else:
-        data = []
-        for i in battle_id:
-            data.append(wareraapi.battle_ranking_get_ranking(type="user", data_type="damage", battle_id=i, side=side).execute())
-    to_return = {}
-    for i in data:
-        if isinstance(data[0], list):  # if 2 or more rounds
-            for j in i:
-                to_return.setdefault(j["user"], 0)
-                to_return[j["user"]] += j["value"]
-        else:
-            to_return.setdefault(i["user"], 0)
-            to_return[i["user"]] += i["value"]
-    return to_return
+    battle_ids = [battle_id] if isinstance(battle_id, str) else battle_id
+    return battles.get_damage_matrix(battle_ids, side).get_totals()
+
+
+def get_damage_matrix(battle_ids: list[str], side: Literal["attacker", "defender"] | None = None,
+                      subject: Literal["user", "mu", "country"] = "user", skip_errors: bool = False) -> DamageMatrix:
+    return battles.get_damage_matrix(battle_ids, side, subject, skip_errors=skip_errors)
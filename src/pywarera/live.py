@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncIterator
+
+from . import wareraapi
+
+logger = logging.getLogger(__name__)
+
+
+class LiveUpdate:
+    """Changes in a battle since the previous update"""
+
+    __slots__ = ("battle_id", "round_id", "hits", "deltas", "data", "finished")
+
+    def __init__(self, battle_id: str, round_id: str | None, hits: list[dict], deltas: dict[str, float], data: dict,
+                 finished: bool):
+        self.battle_id: str = battle_id
+        self.round_id: str | None = round_id
+        self.hits: list[dict] = hits  # Only hits that were not in previous updates
+        self.deltas: dict[str, float] = deltas  # Change of every numeric field of live data, e.g. points of sides
+        self.data: dict = data  # Latest live data
+        self.finished: bool = finished
+
+
+class LiveBattleFeed:
+    """Follows a battle by polling its live data and last hits of its current round.
+
+    Iterating over the feed (with `async for`) yields LiveUpdate only when there are new hits or changed scores.
+    Polling starts every min_interval seconds, slows down by backoff times after every poll without changes up to
+    max_interval, and goes back to min_interval as soon as something changes. Iteration ends when the battle ends.
+    """
+
+    def __init__(self, battle_id: str, min_interval: float = 5, max_interval: float = 60, backoff: float = 1.5,
+                 remember_hits: int = 1000):
+        """:param remember_hits: How many last seen hits are kept to recognize hits that were already yielded"""
+        self.battle_id: str = battle_id
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.backoff: float = backoff
+        self.interval: float = min_interval
+        self.round_id: str | None = None
+        self._numbers: dict[str, float] = {}
+        self._seen: set[str] = set()
+        self._seen_order: deque[str] = deque(maxlen=remember_hits)
+
+    async def __aiter__(self) -> AsyncIterator[LiveUpdate]:
+        while True:
+            update = await self.poll()
+            if update.hits or update.deltas or update.finished:
+                self.interval = self.min_interval
+                yield update
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            if update.finished:
+                return
+            await asyncio.sleep(self.interval)
+
+    async def poll(self) -> LiveUpdate:
+        """Polls the battle once, returns changes since the previous poll"""
+        data = await wareraapi.battle_get_live_battle_data(self.battle_id).execute_async() or {}
+        round_id = self.round_id = _round_id(data)
+        hits = []
+        if round_id is not None:
+            # Last hits are cached for a few seconds, which would hide new hits from polls coming more often
+            last_hits = await wareraapi.round_get_last_hits(round_id).execute_async(refresh=True)
+            hits = self._new_hits(_hits(last_hits))
+        numbers = _numbers(data)
+        deltas = {key: value - self._numbers.get(key, 0) for key, value in numbers.items()
+                  if value != self._numbers.get(key, 0)}
+        self._numbers = numbers
+        return LiveUpdate(self.battle_id, round_id, hits, deltas, data, _is_finished(data))
+
+    def _new_hits(self, hits: list[dict]) -> list[dict]:
+        new = []
+        for hit in hits:
+            key = _hit_key(hit)
+            if key in self._seen:
+                continue
+            if len(self._seen_order) == self._seen_order.maxlen:
+                self._seen.discard(self._seen_order[0])
+            self._seen_order.append(key)
+            self._seen.add(key)
+            new.append(hit)
+        return new
+
+
+async def watch_battles(battle_ids: list[str], **feed_options) -> AsyncIterator[LiveUpdate]:
+    """Follows many battles at once and yields their updates as they come. A battle whose requests fail is
+    no longer followed, any other error of a feed is raised here
+    :param feed_options: Arguments of LiveBattleFeed"""
+    updates = asyncio.Queue()
+    done = object()
+
+    async def follow(battle_id: str):
+        try:
+            async for update in LiveBattleFeed(battle_id, **feed_options):
+                await updates.put(update)
+        except wareraapi.WarEraApiException as e:
+            logger.warning(f"Stopped following battle {battle_id}: {e}")
+        except Exception as e:
+            await updates.put(e)
+        finally:
+            await updates.put(done)
+
+    tasks = [asyncio.ensure_future(follow(battle_id)) for battle_id in battle_ids]
+    try:
+        running = len(tasks)
+        while running:
+            update = await updates.get()
+            if update is done:
+                running -= 1
+            elif isinstance(update, Exception):
+                raise update
+            else:
+                yield update
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _round_id(data: dict) -> str | None:
+    current_round = data.get("round") or data.get("currentRound")
+    if isinstance(current_round, dict):
+        return current_round.get("_id")
+    return current_round if isinstance(current_round, str) else data.get("roundId")
+
+
+def _hits(data) -> list[dict]:
+    if isinstance(data, dict):
+        data = data.get("hits", data.get("items", []))
+    return data or []
+
+
+def _hit_key(hit: dict) -> str:
+    """Hits are identified by their ID, or by all their fields if they have none"""
+    if "_id" in hit:
+        return hit["_id"]
+    return json.dumps(hit, sort_keys=True, separators=(",", ":"))
+
+
+def _numbers(data: dict, prefix: str = "") -> dict[str, float]:
+    """Numeric fields of live data with nested keys joined by dots, e.g. {"round.attackerPoints": 120}"""
+    numbers = {}
+    for key, value in data.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            numbers[prefix + key] = value
+        elif isinstance(value, dict):
+            numbers.update(_numbers(value, f"{prefix}{key}."))
+    return numbers
+
+
+def _is_finished(data: dict) -> bool:
+    battle = data.get("battle") if isinstance(data.get("battle"), dict) else data
+    return battle.get("isActive") is False or bool(battle.get("endedAt"))
@@ -0,0 +1,55 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache with a TTL per entry.
+
+    It sits in front of the persistent requests-cache store and keeps already decoded responses, so hot
+    requests skip SQLite and JSON parsing. Returned objects are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires at, value)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, data: dict | None = None) -> tuple[str, str]:
+        return endpoint, json.dumps(data, sort_keys=True, separators=(",", ":")) if data else ""
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Literal
+
+events = Literal["request", "cache_hit", "cache_miss", "error", "rate_limited", "retry", "wait", "latency", "bytes",
+                 "batch_size"]
+
+# Upper bounds of latency buckets in seconds, the last bucket has no bound
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Upper bounds of batch size buckets
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250)
+
+# Hook gets name of the event, endpoint and value (1 for counters, seconds or bytes for the rest)
+Hook = Callable[[str, str, float], None]
+
+
+class Histogram:
+    """Counts of observed values in buckets, like a Prometheus histogram"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds: tuple[float, ...] = bounds
+        self.counts: list[int] = [0] * (len(bounds) + 1)
+        self.sum: float = 0
+        self.count: int = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the quantile, infinity for the last bucket"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0
+
+
+class EndpointMetrics:
+    __slots__ = ("requests", "cache_hits", "cache_misses", "errors", "rate_limited", "retries", "wait_seconds",
+                 "bytes", "latency", "batch_sizes")
+
+    def __init__(self):
+        self.requests: int = 0  # Sent to the API
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.errors: int = 0
+        self.rate_limited: int = 0  # 429 responses
+        self.retries: int = 0
+        self.wait_seconds: float = 0  # Time spent waiting for the rate limiter and between retries
+        self.bytes: int = 0  # Received from the API
+        self.latency: Histogram = Histogram(LATENCY_BUCKETS)
+        self.batch_sizes: Histogram = Histogram(BATCH_BUCKETS)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0
+
+
+class Metrics:
+    """Counters and histograms of requests for every endpoint. Batches are counted under the "batch" endpoint,
+    while cache hits and misses of batched endpoints are counted under their own names"""
+
+    def __init__(self):
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: events, endpoint: str, value: float = 1):
+        with self._lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = EndpointMetrics()
+            if event == "request":
+                metrics.requests += 1
+            elif event == "cache_hit":
+                metrics.cache_hits += 1
+            elif event == "cache_miss":
+                metrics.cache_misses += 1
+            elif event == "error":
+                metrics.errors += 1
+            elif event == "rate_limited":
+                metrics.rate_limited += 1
+            elif event == "retry":
+                metrics.retries += 1
+            elif event == "wait":
+                metrics.wait_seconds += value
+            elif event == "latency":
+                metrics.latency.observe(value)
+            elif event == "bytes":
+                metrics.bytes += int(value)
+            elif event == "batch_size":
+                metrics.batch_sizes.observe(value)
+
+    def clear(self):
+        with self._lock:
+            self.endpoints.clear()
+
+    def total(self) -> EndpointMetrics:
+        """Counters summed over all endpoints, histograms are not merged"""
+        total = EndpointMetrics()
+        with self._lock:
+            for metrics in self.endpoints.values():
+                for name in ("requests", "cache_hits", "cache_misses", "errors", "rate_limited", "retries",
+                             "wait_seconds", "bytes"):
+                    setattr(total, name, getattr(total, name) + getattr(metrics, name))
+        return total
+
+    def report(self) -> str:
+        """Table with a row for every endpoint, the most requested first"""
+        lines = [f"{'endpoint':<36}{'requests':>9}{'hit rate':>9}{'errors':>7}{'429':>5}{'retries':>8}{'wait s':>8}"
+                 f"{'mean ms':>9}{'p95 ms':>8}{'kB':>9}"]
+        with self._lock:
+            rows = sorted(self.endpoints.items(), key=lambda item: (item[1].requests, item[1].cache_hits), reverse=True)
+            for endpoint, m in rows:
+                lines.append(f"{endpoint:<36}{m.requests:>9}{m.hit_rate:>9.0%}{m.errors:>7}{m.rate_limited:>5}"
+                             f"{m.retries:>8}{m.wait_seconds:>8.2f}{m.latency.mean * 1000:>9.1f}"
+                             f"{m.latency.quantile(0.95) * 1000:>8.0f}{m.bytes / 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+# Everything recorded since the import, see profile() for a part of the code
+metrics = Metrics()
+
+_hooks: list[Hook] = []
+_profiles: list[Metrics] = []
+_lock = threading.Lock()
+
+
+def add_hook(hook: Hook):
+    """Calls the hook on every recorded event, e.g. to export metrics to Prometheus or OpenTelemetry.
+    Hooks are called in the thread sending the request, so they should be fast"""
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Hook):
+    with _lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def record(event: events, endpoint: str, value: float = 1):
+    metrics.record(event, endpoint, value)
+    for profile_metrics in tuple(_profiles):
+        profile_metrics.record(event, endpoint, value)
+    for hook in tuple(_hooks):
+        hook(event, endpoint, value)
+
+
+@contextmanager
+def profile(print_report: bool = False) -> Iterator[Metrics]:
+    """Collects metrics only of requests made inside the block, from any thread:
+
+    with profile() as block:
+        pywarera.get_country_citizens(country_id)
+    print(block.report())
+    """
+    block = Metrics()
+    start = time.perf_counter()
+    with _lock:
+        _profiles.append(block)
+    try:
+        yield block
+    finally:
+        with _lock:
+            _profiles.remove(block)
+        if print_report:
+            print(block.report())
+            print(f"Took {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,101 @@
+from queue import Empty, Full, Queue
+import threading
+from typing import Any, Callable, Iterable, Iterator
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class Pipeline:
+    """Runs stages of a crawl in threads connected with bounded queues.
+
+    Every stage starts working on an item as soon as the previous stage produces it, so stages overlap instead of
+    waiting for each other. Iterating over the pipeline yields items put to its `output` queue as they arrive.
+    Stopping the iteration (or an exception in any stage) stops all stages.
+    """
+
+    def __init__(self, queue_size: int = 4):
+        self.queue_size: int = queue_size
+        self.output: Queue = self.queue()
+        self._producers: dict[int, int] = {}  # id of queue -> number of stages that put items to it
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+    def queue(self) -> Queue:
+        return Queue(maxsize=self.queue_size)
+
+    def source(self, iterable: Iterable, outputs: list[Queue]):
+        """Adds a stage that puts every item of the iterable to all outputs"""
+        self._add(lambda: iterable, outputs)
+
+    def stage(self, input_queue: Queue, func: Callable[[Any], Iterable], outputs: list[Queue]):
+        """Adds a stage that calls func with every item of input_queue and puts everything it returns to all outputs"""
+        def run():
+            for item in self._consume(input_queue):
+                yield from func(item)
+        self._add(run, outputs)
+
+    def _add(self, produce: Callable[[], Iterable], outputs: list[Queue]):
+        for output in outputs:
+            self._producers[id(output)] = self._producers.get(id(output), 0) + 1
+
+        def run():
+            try:
+                for result in produce():
+                    for output in outputs:
+                        self._put(output, result)
+            except _Stopped:
+                return
+            except BaseException as e:
+                self._error = self._error or e
+                self._stop.set()
+                return
+            for output in outputs:
+                try:
+                    self._put(output, _DONE)
+                except _Stopped:
+                    return
+
+        self._threads.append(threading.Thread(target=run, name=f"pywarera-pipeline-{len(self._threads)}", daemon=True))
+
+    def _put(self, output: Queue, item):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                output.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def _consume(self, input_queue: Queue) -> Iterator:
+        producers = self._producers.get(id(input_queue), 0)
+        while producers:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                item = input_queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if item is _DONE:
+                producers -= 1
+                continue
+            yield item
+
+    def __iter__(self) -> Iterator:
+        for thread in self._threads:
+            thread.start()
+        try:
+            yield from self._consume(self.output)
+        except _Stopped:
+            pass
+        finally:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,172 @@
+import copy
+
+from .classes.Country import Country
+from .classes.ItemPrices import ItemPrices
+from .classes.ItemsConfig import ItemsConfig
+from .classes.Region import Region
+
+
+class ProductionEngine:
+    """Evaluates production chains of all items at once.
+
+    The dependency graph of items (from Item.production_needs) is built once and walked in topological order, so
+    shared sub-chains are evaluated only once. When prices change, update_prices() re-evaluates only the items
+    that depend on changed prices.
+
+    :param point_value: Money value of one production point (e.g. a wage), used to decide whether an input is cheaper
+    to buy or to produce. By default it is the market value of a production point: the median price per point of
+    raw items, which are produced from points only
+    """
+
+    def __init__(self, items: ItemsConfig, prices: ItemPrices | None = None, point_value: float | None = None):
+        self.items: ItemsConfig = items
+        self.point_value: float | None = point_value
+        self.needs: dict[str, dict[str, int]] = {code: dict(item.production_needs or {})
+                                                 for code, item in items.to_dict().items()}
+        self.production_points: dict[str, int] = {code: item.production_points or 0
+                                                  for code, item in items.to_dict().items()}
+        self.dependents: dict[str, set[str]] = {code: set() for code in self.needs}
+        for code, needs in self.needs.items():
+            for need in needs:
+                self.dependents.setdefault(need, set()).add(code)
+        self.order: list[str] = self._topological_order()
+        # Production points of the whole chain, if every input is produced too
+        self.chain_points: dict[str, float] = {}
+        for code in self.order:
+            self.chain_points[code] = self.production_points.get(code, 0) + sum(
+                amount * self.chain_points.get(need, 0) for need, amount in self.needs.get(code, {}).items())
+
+        self.prices: ItemPrices | None = None
+        self.market_point_value: float = 0
+        self.price: dict[str, float] = {}
+        self.input_cost: dict[str, float] = {}  # Inputs bought on the market
+        self.chain_cost: dict[str, float] = {}  # Cheapest way to get inputs: buy them or produce them
+        self.margin: dict[str, float] = {}
+        if prices is not None:
+            self.update_prices(prices)
+
+    def _topological_order(self) -> list[str]:
+        """Inputs go before items produced from them"""
+        order, state = [], {}
+
+        def visit(code: str):
+            if state.get(code) == "done":
+                return
+            if state.get(code) == "visiting":
+                raise ValueError(f"Production chain of {code} is cyclic")
+            state[code] = "visiting"
+            for need in self.needs.get(code, {}):
+                visit(need)
+            state[code] = "done"
+            order.append(code)
+
+        for code in self.needs:
+            visit(code)
+        return order
+
+    def update_prices(self, prices: ItemPrices):
+        """Re-evaluates items whose own price or price of any input in their chain has changed"""
+        new_prices = prices.to_dict()
+        market_point_value = self._market_point_value(new_prices)
+        if self.prices is None or (self.point_value is None and market_point_value != self.market_point_value):
+            changed = set(self.order)
+        else:
+            changed = {code for code in self.order if new_prices.get(code, 0) != self.price.get(code)}
+        self.prices = prices
+        self.market_point_value = market_point_value
+        # Everything produced from changed items is affected too
+        affected, stack = set(), list(changed)
+        while stack:
+            code = stack.pop()
+            if code not in affected:
+                affected.add(code)
+                stack.extend(self.dependents.get(code, ()))
+        for code in self.order:
+            if code in affected:
+                self._evaluate(code, new_prices.get(code, 0))
+
+    def evaluated(self, prices: ItemPrices, point_value: float | None = None) -> "ProductionEngine":
+        """New engine evaluated with the prices, sharing the dependency graph with this one, which stays unchanged.
+        If this engine was evaluated with the same point_value, only items affected by changed prices are evaluated"""
+        engine = copy.copy(self)
+        engine.point_value = point_value
+        engine.price = dict(self.price)
+        engine.input_cost = dict(self.input_cost)
+        engine.chain_cost = dict(self.chain_cost)
+        engine.margin = dict(self.margin)
+        if point_value != self.point_value:
+            engine.prices = None  # Every item has to be evaluated again
+        engine.update_prices(prices)
+        return engine
+
+    def set_point_value(self, point_value: float | None):
+        """Changes the value of one production point and re-evaluates every item, None for the market value"""
+        self.point_value = point_value
+        if self.prices is not None:
+            for code in self.order:
+                self._evaluate(code, self.price.get(code, 0))
+
+    def get_point_value(self) -> float:
+        return self.point_value if self.point_value is not None else self.market_point_value
+
+    def _market_point_value(self, prices: dict[str, float]) -> float:
+        """Median price per production point of raw items with a price"""
+        values = sorted(prices.get(code, 0) / points for code, points in self.production_points.items()
+                        if points and not self.needs.get(code) and prices.get(code, 0) > 0)
+        if not values:
+            return 0
+        middle = len(values) // 2
+        return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+    def _evaluate(self, code: str, price: float):
+        self.price[code] = price
+        needs = self.needs.get(code, {})
+        self.input_cost[code] = sum(amount * self.price.get(need, 0) for need, amount in needs.items())
+        self.chain_cost[code] = sum(amount * self.get_obtain_cost(need) for need, amount in needs.items())
+        self.margin[code] = price - self.input_cost[code]
+
+    def get_obtain_cost(self, code: str) -> float:
+        """Cheapest way to get one unit of the item: buy it or produce it (paying point_value for production points)"""
+        make = self.chain_cost.get(code, 0) + self.production_points.get(code, 0) * self.get_point_value()
+        price = self.price.get(code, 0)
+        return min(price, make) if price else make
+
+    def get_margin_per_point(self, code: str, bonus: float = 0) -> float:
+        """Profit from one production point spent on the item with inputs bought on the market
+        :param bonus: Production bonus, e.g. 0.1 for +10%"""
+        points = self.production_points.get(code, 0)
+        return self.margin.get(code, 0) * (1 + bonus) / points if points else 0
+
+    def get_chain_value_per_point(self, code: str) -> float:
+        """Price of the item divided by production points of its whole chain"""
+        points = self.chain_points.get(code, 0)
+        return self.price.get(code, 0) / points if points else 0
+
+    @staticmethod
+    def get_bonus(code: str, region: Region | None = None, country: Country | None = None) -> float:
+        """Production bonus for the item in the region (deposit) and country (strategic resources)"""
+        bonus = 0
+        if region is not None and region.deposit_type == code:
+            bonus += region.deposit_production_bonus
+        if country is not None:
+            bonus += country.production_bonus
+        return bonus
+
+    def rank_items(self, region: Region | None = None, country: Country | None = None) -> list[tuple[str, float]]:
+        """Items sorted by margin per production point, the best first
+        :return: List[Tuple(item code, margin per production point)]"""
+        ranking = [(code, self.get_margin_per_point(code, self.get_bonus(code, region, country)))
+                   for code in self.order if self.production_points.get(code)]
+        return sorted(ranking, key=lambda pair: pair[1], reverse=True)
+
+    def find_best(self, regions: list[Region], countries: dict[str, Country] | None = None) -> list[tuple[str, str, float]]:
+        """Best item for every region
+        :param countries: Countries by ID, to include their production bonuses
+        :return: List[Tuple(region ID, item code, margin per production point)], the best first"""
+        best = []
+        for region in regions:
+            country = countries.get(region.country) if countries else None
+            ranking = self.rank_items(region, country)
+            if ranking:
+                best.append((region.id, *ranking[0]))
+        return sorted(best, key=lambda entry: entry[2], reverse=True)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections.abc import Mapping
+
+
+class RateLimiter:
+    """Adaptive limiter shared by every thread (and so every async request) sending API requests.
+
+    It is driven by Ratelimit-Limit / Ratelimit-Remaining / Ratelimit-Reset headers of responses:
+    requests go at full speed while most of the budget remains, are spread evenly over the rest of the
+    window once less than `pace_below` of the budget is left, and wait for the reset when nothing is left.
+    """
+
+    def __init__(self, limit: int = 100, window: float = 60, pace_below: float = 0.2):
+        self.limit: int = limit  # Assumed until the server tells us otherwise
+        self.window: float = window
+        self.pace_below: float = pace_below
+        self.remaining: int = limit
+        self.reset_at: float = time.monotonic() + window
+        self._next_slot: float = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, min_interval: float = 0) -> float:
+        """Blocks until a request can be sent, returns how many seconds were waited
+        :param min_interval: Minimal delay between two consecutive requests"""
+        with self._lock:
+            now = time.monotonic()
+            slot = self._reserve(now, min_interval)
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0)
+
+    def _reserve(self, now: float, min_interval: float) -> float:
+        """Books the next free slot for a request and returns its time. Must be called under the lock"""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        slot = max(now, self._next_slot)
+        if self.remaining <= 0:
+            # Budget is exhausted, so the next request waits for the window to reset
+            slot = max(slot, self.reset_at)
+            self.remaining = self.limit
+            self.reset_at = slot + self.window
+        interval = min_interval
+        if self.remaining <= self.limit * self.pace_below:
+            interval = max(interval, (self.reset_at - slot) / self.remaining)
+        self.remaining -= 1
+        self._next_slot = slot + interval
+        return slot
+
+    def update(self, headers: Mapping, status_code: int = 200):
+        """Synchronizes the limiter with rate limit headers of a (not cached) response"""
+        limit = _to_number(headers.get("Ratelimit-Limit"))
+        remaining = _to_number(headers.get("Ratelimit-Remaining"))
+        reset = _to_number(headers.get("Ratelimit-Reset"))
+        with self._lock:
+            now = time.monotonic()
+            if limit is not None and limit > 0:
+                # Budget grows with the limit, e.g. when the server allows more than was assumed
+                self.remaining += max(0, int(limit) - self.limit)
+                self.limit = int(limit)
+            if status_code == 429:
+                self.remaining = 0
+                self.reset_at = now + (reset if reset is not None else self.window) + 1
+                return
+            if reset is not None:
+                reset_at = now + reset
+                if reset_at > self.reset_at + 1:
+                    # A new window has started, the server knows better than our local count
+                    self.remaining = self.limit
+                self.reset_at = reset_at
+            if remaining is not None:
+                # Responses can arrive out of order, so never give back budget already reserved by other requests
+                self.remaining = min(self.remaining, int(remaining))
+
+    def reset(self):
+        """Forgets everything learned from the headers"""
+        with self._lock:
+            self.remaining = self.limit
+            self.reset_at = time.monotonic() + self.window
+            self._next_slot = 0.0
+
+
+def _to_number(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
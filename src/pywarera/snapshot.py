@@ -0,0 +1,94 @@
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from . import wareraapi
+from .classes.Company import Company
+from .classes.Country import Country
+from .classes.Government import Government
+from .classes.Region import Region
+from .classes.User import User
+from .wareraapi import BatchSession, EndpointCall
+
+logger = logging.getLogger(__name__)
+
+
+class WorldSnapshot:
+    """State of the game taken in one run, every model is stored by its ID"""
+
+    def __init__(self):
+        self.taken_at: datetime.datetime = datetime.datetime.now(datetime.UTC)
+        self.countries: dict[str, Country] = {}
+        self.governments: dict[str, Government] = {}  # Key is country ID
+        self.regions: dict[str, Region] = {}
+        self.users: dict[str, User] = {}
+        self.companies: dict[str, Company] = {}
+        self.citizens: dict[str, list[str]] = {}  # Country ID -> IDs of its citizens
+
+    def get_country_citizens(self, country_id: str) -> list[User]:
+        return [self.users[user_id] for user_id in self.citizens.get(country_id, []) if user_id in self.users]
+
+    def get_user_companies(self, user_id: str) -> list[Company]:
+        return [company for company in self.companies.values() if company.user == user_id]
+
+
+def take_world_snapshot(country_ids: list[str] | None = None, with_users: bool = True, with_companies: bool = True,
+                        workers: int = 4) -> WorldSnapshot:
+    """Takes a snapshot of countries, governments, regions and (optionally) citizens and their companies.
+    All requests go through the shared rate limiter and cache
+    :param country_ids: Countries to crawl citizens of. All countries by default
+    :param workers: How many countries are crawled at once
+    """
+    snapshot = WorldSnapshot()
+    raw_countries = wareraapi.country_get_all_countries().execute()
+    if country_ids is None:
+        country_ids = [country["_id"] for country in raw_countries]
+    raw_regions = wareraapi.region_get_regions_object().execute()
+    raw_governments = _fetch_batch([wareraapi.government_get_by_country_id(country["_id"]) for country in raw_countries])
+
+    raw_users, raw_companies = [], []
+    if with_users or with_companies:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pywarera-snapshot") as executor:
+            crawls = executor.map(lambda country_id: _crawl_country(country_id, with_users, with_companies), country_ids)
+            for country_id, (citizen_ids, users, companies) in zip(country_ids, crawls):
+                snapshot.citizens[country_id] = citizen_ids
+                raw_users.extend(users)
+                raw_companies.extend(companies)
+        logger.info(f"Crawled {len(country_ids)} countries: {len(raw_users)} users, {len(raw_companies)} companies")
+
+    # Models are built in this process: responses are already decoded, and sending them to other processes
+    # costs far more than building models from them
+    snapshot.countries = {country.id: country for country in map(Country, raw_countries)}
+    snapshot.regions = {region.id: region for region in map(Region, raw_regions.values())}
+    snapshot.governments = {government.country: government for government in map(Government, raw_governments)}
+    snapshot.users = {user.id: user for user in map(User, raw_users)}
+    snapshot.companies = {company.id: company for company in map(Company, raw_companies)}
+    return snapshot
+
+
+def _crawl_country(country_id: str, with_users: bool, with_companies: bool) -> tuple[list[str], list[dict], list[dict]]:
+    citizen_ids = [item["_id"] for item in
+                   wareraapi.user_get_users_by_country(country_id, limit=100).iter_items(prefetch=True)]
+    users, companies = [], []
+    if with_users:
+        users = _fetch_batch([wareraapi.user_get_user_lite(user_id) for user_id in citizen_ids])
+    if with_companies:
+        company_ids = [company_id for page in
+                       _fetch_batch([wareraapi.company_get_companies(user_id, per_page=15) for user_id in citizen_ids])
+                       for company_id in page.get("items", [])]
+        companies = _fetch_batch([wareraapi.company_get_by_id(company_id) for company_id in company_ids])
+    return citizen_ids, users, companies
+
+
+def _fetch_batch(calls: list[EndpointCall]) -> list[dict]:
+    """Returns data of every batched response, skipping the broken ones"""
+    with BatchSession() as batch:
+        for call in calls:
+            batch.add(call)
+    to_return = []
+    for response in batch.responses:
+        try:
+            to_return.append(response["result"]["data"])
+        except (KeyError, TypeError):
+            logger.warning(f"Skipped broken response in a snapshot: {response}")
+    return to_return
@@ -0,0 +1,175 @@
+import json
+import logging
+import sqlite3
+import threading
+from typing import Callable, Iterable, Literal
+
+from .classes.Company import Company
+from .classes.Country import Country
+from .classes.MilitaryUnit import MilitaryUnit
+from .classes.Region import Region
+from .classes.User import User
+from .wareraapi import EndpointCall
+
+logger = logging.getLogger(__name__)
+
+entity_kinds = Literal["user", "company", "region", "country", "mu", "battle"]
+
+
+def _get(*path: str) -> Callable[[dict], object]:
+    def get(data: dict):
+        for key in path:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        # Referenced entities can come populated
+        if isinstance(data, dict):
+            return data.get("_id")
+        return None if isinstance(data, list) else data
+    return get
+
+
+# Entity kind -> (table, Dict{indexed column: how to get it from raw data}, indexes)
+_TABLES: dict[str, tuple[str, dict[str, Callable[[dict], object]], list[tuple[str, ...]]]] = {
+    "user": ("users", {"country": _get("country"), "level": _get("leveling", "level"), "mu": _get("mu"),
+                       "is_active": _get("isActive")}, [("country", "level"), ("mu",)]),
+    "company": ("companies", {"user": _get("user"), "region": _get("region"), "item_code": _get("itemCode"),
+                              "production": _get("production")}, [("region", "item_code"), ("item_code",), ("user",)]),
+    "region": ("regions", {"country": _get("country"), "deposit_type": _get("deposit", "type")},
+               [("country",), ("deposit_type",)]),
+    "country": ("countries", {"name": _get("name"), "code": _get("code")}, [("name",)]),
+    "mu": ("mus", {"user": _get("user"), "region": _get("region")}, [("region",)]),
+    "battle": ("battles", {"war": _get("war"), "is_active": _get("isActive")}, [("war",), ("is_active",)]),
+}
+
+_MODELS = {"user": User, "company": Company, "region": Region, "country": Country, "mu": MilitaryUnit}
+
+# Endpoint -> (entity kind, whether the result is a list of entities)
+_ENDPOINTS: dict[str, tuple[str, bool]] = {
+    "/user.getUserLite": ("user", False),
+    "/company.getById": ("company", False),
+    "/region.getById": ("region", False),
+    "/region.getRegionsObject": ("region", True),
+    "/country.getCountryById": ("country", False),
+    "/country.getAllCountries": ("country", True),
+    "/mu.getById": ("mu", False),
+    "/mu.getManyPaginated": ("mu", True),
+    "/battle.getById": ("battle", False),
+    "/battle.getBattles": ("battle", True),
+}
+
+
+class EntityStore:
+    """Local SQLite store of users, companies, regions, countries, MUs and battles.
+
+    Every entity is stored as its raw data with the most queried fields in indexed columns, so queries like
+    "companies by region and item code" are answered without the API. Adding an entity that is already stored
+    replaces it. By default the store is kept in memory, pass a path to keep it between runs.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path: str = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            for table, columns, indexes in _TABLES.values():
+                self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, "
+                                         f"{', '.join(columns)}, data TEXT NOT NULL)")
+                for index in indexes:
+                    self._connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{'_'.join(index)} "
+                                             f"ON {table} ({', '.join(index)})")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, entity: entity_kinds, data: Iterable[dict]) -> int:
+        """Inserts or replaces entities from their raw data
+        :return: Number of stored entities"""
+        table, columns, _ = _TABLES[entity]
+        rows = [(item["_id"], *(column(item) for column in columns.values()), json.dumps(item, separators=(",", ":")))
+                for item in data if isinstance(item, dict) and "_id" in item]
+        names = ", ".join(columns)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in (*columns, "data"))
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT INTO {table} (id, {names}, data) VALUES "
+                                         f"({', '.join('?' * (len(columns) + 2))}) "
+                                         f"ON CONFLICT (id) DO UPDATE SET {updates}", rows)
+        return len(rows)
+
+    def ingest(self, call: EndpointCall, result=None) -> int:
+        """Stores entities from the result of the call. The call is executed if the result is not given
+        :return: Number of stored entities"""
+        known = _ENDPOINTS.get(call.endpoint_path)
+        if known is None:
+            logger.warning(f"Don't know which entities {call.endpoint_path} returns, nothing was stored")
+            return 0
+        entity, is_list = known
+        if result is None:
+            result = call.execute()
+        if isinstance(result, tuple):  # Paginated list
+            result = result[0]
+        elif isinstance(result, dict) and is_list:
+            result = result.get("items", result.values())
+        return self.add(entity, result if is_list else [result])
+
+    def delete(self, entity: entity_kinds, ids: Iterable[str]):
+        with self._lock, self._connection:
+            self._connection.executemany(f"DELETE FROM {_TABLES[entity][0]} WHERE id = ?", ((i,) for i in ids))
+
+    def count(self, entity: entity_kinds) -> int:
+        return self._query(f"SELECT COUNT(*) FROM {_TABLES[entity][0]}")[0][0]
+
+    def get_raw(self, entity: entity_kinds, entity_id: str) -> dict | None:
+        rows = self._query(f"SELECT data FROM {_TABLES[entity][0]} WHERE id = ?", (entity_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get(self, entity: entity_kinds, entity_id: str):
+        """Stored entity as its model class (raw data for battles), None if it is not stored"""
+        data = self.get_raw(entity, entity_id)
+        return data if data is None or entity not in _MODELS else _MODELS[entity](data)
+
+    def find(self, entity: entity_kinds, raw: bool = False, **conditions) -> list:
+        """Entities where indexed columns are equal to the given values, e.g. find("company", region="r1").
+        A tuple of (operator, value) compares with the operator instead, e.g. find("user", level=(">=", 20))"""
+        table, columns, _ = _TABLES[entity]
+        where, parameters = [], []
+        for column, value in conditions.items():
+            if column not in columns and column != "id":
+                raise ValueError(f"{column} is not an indexed column of {table}, use one of {list(columns)}")
+            operator, value = value if isinstance(value, tuple) else ("=", value)
+            if operator not in ("=", "!=", "<", "<=", ">", ">="):
+                raise ValueError(f"Wrong operator: {operator}")
+            where.append(f"{column} {operator} ?")
+            parameters.append(value)
+        sql = f"SELECT data FROM {table}" + (f" WHERE {' AND '.join(where)}" if where else "")
+        rows = [json.loads(data) for data, in self._query(sql, parameters)]
+        if raw or entity not in _MODELS:
+            return rows
+        return [_MODELS[entity](data) for data in rows]
+
+    def get_companies(self, region: str | None = None, item_code: str | None = None, user: str | None = None) -> list[Company]:
+        conditions = {"region": region, "item_code": item_code, "user": user}
+        return self.find("company", **{k: v for k, v in conditions.items() if v is not None})
+
+    def get_citizens(self, country_id: str, min_level: int = 0) -> list[User]:
+        return self.find("user", country=country_id, level=(">=", min_level))
+
+    def get_country_regions(self, country_id: str) -> list[Region]:
+        return self.find("region", country=country_id)
+
+    def count_by(self, entity: entity_kinds, column: str) -> dict:
+        """Number of entities for every value of an indexed column, e.g. count_by("company", "item_code")"""
+        table, columns, _ = _TABLES[entity]
+        if column not in columns:
+            raise ValueError(f"{column} is not an indexed column of {table}, use one of {list(columns)}")
+        return dict(self._query(f"SELECT {column}, COUNT(*) FROM {table} GROUP BY {column}"))
+
+    def _query(self, sql: str, parameters: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, tuple(parameters)).fetchall()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Literal
+
+from . import wareraapi
+from .wareraapi import BatchSession
+
+logger = logging.getLogger(__name__)
+
+entity_kinds = Literal["user", "company", "country"]
+event_kinds = Literal["created", "updated", "deleted"]
+
+_CALLS = {
+    "user": wareraapi.user_get_user_lite,
+    "company": wareraapi.company_get_by_id,
+}
+
+
+class ChangeEvent:
+    __slots__ = ("kind", "entity", "id", "changes", "data")
+
+    def __init__(self, kind: event_kinds, entity: entity_kinds, entity_id: str, changes: dict[str, tuple], data: dict | None):
+        self.kind: event_kinds = kind
+        self.entity: entity_kinds = entity
+        self.id: str = entity_id
+        self.changes: dict[str, tuple] = changes  # Dotted path of the field -> Tuple(old value, new value)
+        self.data: dict | None = data  # New data, None for deleted entities
+
+    def __repr__(self):
+        return f"ChangeEvent({self.kind} {self.entity} {self.id}: {list(self.changes)})"
+
+
+class ChangeTracker:
+    """Keeps the last seen version of users, companies and countries, and reports what changed since then.
+
+    Entities are compared by `__v` and `updatedAt` when the data has them, and by the whole data otherwise, so only
+    changed entities are diffed field by field. Users and companies have to be fetched one by one, so they are
+    re-checked only when they could have changed: an entity is checked again min_interval seconds after it changed,
+    and the interval doubles with every check that finds no change, up to max_interval.
+    State can be saved to a JSON file and loaded by the next run.
+    """
+
+    def __init__(self, min_interval: float = 3600, max_interval: float = 86400):
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        # Entity kind -> ID -> {"version", "data", "checked_at", "interval"}
+        self.entities: dict[str, dict[str, dict]] = {"user": {}, "company": {}, "country": {}}
+
+    def track(self, entity: Literal["user", "company"], ids: list[str]):
+        """Starts tracking entities, they are fetched by the next sync"""
+        for entity_id in ids:
+            self.entities[entity].setdefault(entity_id, {"version": None, "data": None, "checked_at": 0,
+                                                         "interval": self.min_interval})
+
+    def untrack(self, entity: entity_kinds, ids: list[str]):
+        for entity_id in ids:
+            self.entities[entity].pop(entity_id, None)
+
+    def get_due(self, entity: Literal["user", "company"], now: float | None = None) -> list[str]:
+        """IDs of tracked entities that should be checked now"""
+        now = time.time() if now is None else now
+        return [entity_id for entity_id, seen in self.entities[entity].items()
+                if now >= seen["checked_at"] + seen["interval"]]
+
+    def sync(self, force: bool = False) -> list[ChangeEvent]:
+        """Checks countries and all tracked users and companies that are due
+        :param force: Check every tracked entity, even if it is not due"""
+        return self.sync_countries() + self.sync_entities("user", force) + self.sync_entities("company", force)
+
+    def sync_countries(self) -> list[ChangeEvent]:
+        """All countries come in one response, so they are always checked all together"""
+        data = wareraapi.country_get_all_countries().execute()
+        events = self._compare("country", {country["_id"]: country for country in data})
+        seen = self.entities["country"]
+        current = {country["_id"] for country in data}
+        for country_id in [country_id for country_id in seen if country_id not in current]:
+            events.append(ChangeEvent("deleted", "country", country_id, {}, None))
+            del seen[country_id]
+        return events
+
+    def sync_entities(self, entity: Literal["user", "company"], force: bool = False) -> list[ChangeEvent]:
+        ids = list(self.entities[entity]) if force else self.get_due(entity)
+        if not ids:
+            return []
+        # Cached responses could be older than the last check
+        with BatchSession(use_cache=False) as batch:
+            for entity_id in ids:
+                batch.add(_CALLS[entity](entity_id))
+        fetched, deleted = {}, []
+        for entity_id, response in zip(ids, batch.responses):
+            try:
+                fetched[entity_id] = response["result"]["data"]
+            except (KeyError, TypeError):
+                if _is_not_found(response):
+                    deleted.append(entity_id)
+                else:
+                    # Checked again by the next sync
+                    logger.warning(f"Could not sync {entity} {entity_id}: {response}")
+        events = self._compare(entity, fetched)
+        seen = self.entities[entity]
+        for entity_id in deleted:
+            events.append(ChangeEvent("deleted", entity, entity_id, {}, None))
+            del seen[entity_id]
+        return events
+
+    def _compare(self, entity: entity_kinds, fetched: dict[str, dict]) -> list[ChangeEvent]:
+        now = time.time()
+        events = []
+        seen_entities = self.entities[entity]
+        for entity_id, data in fetched.items():
+            version = _version(data)
+            seen = seen_entities.get(entity_id)
+            if seen is None or seen["data"] is None:
+                events.append(ChangeEvent("created", entity, entity_id, {}, data))
+                seen = seen_entities[entity_id] = {"interval": self.min_interval}
+            elif seen["version"] == version:
+                seen["checked_at"] = now
+                seen["interval"] = min(seen["interval"] * 2, self.max_interval)
+                continue
+            else:
+                changes = diff(seen["data"], data)
+                if changes:
+                    events.append(ChangeEvent("updated", entity, entity_id, changes, data))
+                seen["interval"] = self.min_interval
+            seen.update(version=version, data=data, checked_at=now)
+        return events
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"min_interval": self.min_interval, "max_interval": self.max_interval,
+                       "entities": self.entities}, file)
+
+    @classmethod
+    def load(cls, path: str) -> "ChangeTracker":
+        with open(path, encoding="utf-8") as file:
+            state = json.load(file)
+        tracker = cls(state["min_interval"], state["max_interval"])
+        tracker.entities.update(state["entities"])
+        return tracker
+
+
+def _is_not_found(response) -> bool:
+    """Whether the batch item is an error saying that the entity does not exist"""
+    error = response.get("error") if isinstance(response, dict) else None
+    if not isinstance(error, dict):
+        return False
+    error = error.get("json", error)
+    data = error.get("data") or {}
+    return "NOT_FOUND" in (error.get("code"), data.get("code")) or data.get("httpStatus") == 404
+
+
+def _version(data: dict) -> str:
+    """`__v` and `updatedAt` if the entity has them, hash of the whole data otherwise"""
+    if "__v" in data or "updatedAt" in data:
+        return f"{data.get('__v')}:{data.get('updatedAt')}"
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def diff(old: dict, new: dict, prefix: str = "") -> dict[str, tuple]:
+    """Field-level differences of two versions of raw data. Nested objects are compared field by field,
+    lists as a whole
+    :return: Dict{dotted path: Tuple(old value, new value)}, missing fields are None"""
+    changes = {}
+    for key in old.keys() | new.keys():
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changes.update(diff(old_value, new_value, f"{prefix}{key}."))
+        else:
+            changes[prefix + key] = (old_value, new_value)
+    return changes
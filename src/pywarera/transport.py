@@ -0,0 +1,153 @@
+import io
+import json
+import random
+import threading
+import time
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+# Handler of an endpoint gets its input and returns data of the response
+Handler = Callable[[dict | None], Any]
+
+
+def _parse_url(url: str) -> tuple[list[str], bool, dict | None]:
+    """:return: Tuple(endpoints, whether it is a batch, input)"""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    endpoints = parsed.path.split("/trpc/", 1)[-1].split(",")
+    data = json.loads(query["input"][0]) if "input" in query else None
+    return endpoints, bool(query.get("batch")), data
+
+
+def _key(endpoint: str, data: dict | None) -> str:
+    return f"{endpoint}?{json.dumps(data, sort_keys=True, separators=(',', ':')) if data else ''}"
+
+
+class ReplayTransport(BaseAdapter):
+    """Answers API requests locally from fixtures instead of the network, e.g. for benchmarks and tests:
+
+    wareraapi.mount_transport(ReplayTransport({"user.getUserLite": lambda data: {"_id": data["userId"]}}))
+
+    Fixtures map endpoint names to handlers called with the input of the request, or to static data.
+    Responses recorded by RecordingTransport are answered first. Batched requests are split and every endpoint
+    is answered separately, as the API does. Latency, 429 responses and malformed JSON can be injected.
+    """
+
+    def __init__(self, fixtures: dict[str, Handler | Any] | None = None, recorded: dict[str, Any] | None = None,
+                 latency: float = 0, rate_limit_rate: float = 0, malformed_rate: float = 0,
+                 rate_limit: int = 1000, seed: int | None = None):
+        """
+        :param latency: Seconds every response takes
+        :param rate_limit_rate: Part of requests answered with 429, from 0 to 1
+        :param malformed_rate: Part of requests answered with broken JSON, from 0 to 1
+        :param rate_limit: Ratelimit-Limit sent in headers, Ratelimit-Remaining counts down from it every minute
+        """
+        super().__init__()
+        self.fixtures: dict[str, Handler | Any] = fixtures or {}
+        self.recorded: dict[str, Any] = recorded or {}
+        self.latency: float = latency
+        self.rate_limit_rate: float = rate_limit_rate
+        self.malformed_rate: float = malformed_rate
+        self.rate_limit: int = rate_limit
+        self.calls: dict[str, int] = {}  # Endpoint -> how many times it was requested, batched endpoints included
+        self.requests: int = 0  # HTTP requests, a batch is one request
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._remaining = rate_limit
+
+    @classmethod
+    def load(cls, path: str, **options) -> "ReplayTransport":
+        """Replays responses saved by RecordingTransport.save()"""
+        with open(path, encoding="utf-8") as file:
+            return cls(recorded=json.load(file), **options)
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.latency:
+            time.sleep(self.latency)
+        endpoints, is_batch, data = _parse_url(request.url)
+        with self._lock:
+            self.requests += 1
+            for endpoint in endpoints:
+                self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start, self._remaining = now, self.rate_limit
+            self._remaining = max(0, self._remaining - 1)
+            headers = {"Content-Type": "application/json", "Ratelimit-Limit": str(self.rate_limit),
+                       "Ratelimit-Remaining": str(self._remaining),
+                       "Ratelimit-Reset": str(max(0, int(60 - (now - self._window_start))))}
+            rate_limited = self._random.random() < self.rate_limit_rate
+            malformed = not rate_limited and self._random.random() < self.malformed_rate
+        if rate_limited:
+            headers.update({"Ratelimit-Remaining": "0", "Ratelimit-Reset": "0"})
+            return self._response(request, 429, {"error": {"message": "Too many requests"}}, headers)
+        if malformed:
+            return self._response(request, 200, b'{"result": {"data": ', headers)
+        if is_batch:
+            body = [self._answer(endpoint, (data or {}).get(str(i))) for i, endpoint in enumerate(endpoints)]
+            return self._response(request, 200, body, headers)
+        body = self._answer(endpoints[0], data)
+        return self._response(request, 404 if "error" in body else 200, body, headers)
+
+    def _answer(self, endpoint: str, data: dict | None) -> dict:
+        key = _key(endpoint, data)
+        if key in self.recorded:
+            return {"result": {"data": self.recorded[key]}}
+        if endpoint not in self.fixtures:
+            return {"error": {"message": f"No fixture for {endpoint}", "code": "NOT_FOUND"}}
+        fixture = self.fixtures[endpoint]
+        return {"result": {"data": fixture(data) if callable(fixture) else fixture}}
+
+    @staticmethod
+    def _response(request: PreparedRequest, status: int, body, headers: dict) -> Response:
+        content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        response = Response()
+        response.status_code = status
+        response.reason = "OK" if status == 200 else "Error"
+        response._content = content
+        response.headers.update(headers)
+        # requests-cache reads the original url and headers from the raw response
+        response.raw = HTTPResponse(body=io.BytesIO(content), headers=headers, status=status, preload_content=False,
+                                    request_url=request.url)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(HTTPAdapter):
+    """Sends requests to the API as usual and records data of every successful response for ReplayTransport.
+    Batched responses are recorded for every endpoint separately"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.recorded: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            try:
+                body = response.json()
+            except ValueError:
+                return response
+            endpoints, is_batch, data = _parse_url(request.url)
+            with self._lock:
+                if is_batch and isinstance(body, list):
+                    for i, (endpoint, item) in enumerate(zip(endpoints, body)):
+                        if "result" in item:
+                            self.recorded[_key(endpoint, (data or {}).get(str(i)))] = item["result"].get("data")
+                elif isinstance(body, dict) and "result" in body:
+                    self.recorded[_key(endpoints[0], data)] = body["result"].get("data")
+        return response
+
+    def save(self, path: str):
+        with self._lock, open(path, "w", encoding="utf-8") as file:
+            json.dump(self.recorded, file)
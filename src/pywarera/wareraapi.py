@@ -1,27 +1,62 @@
+import contextlib
+import functools
 import math
 import logging
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 
-import requests
-from requests_cache import CachedSession
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests_cache import BaseCache, CachedSession
+from requests_cache.backends import init_backend
 from requests import RequestException, PreparedRequest, Response
 import datetime
 import json
 import time
-from typing import Literal
+from typing import AsyncIterator, Callable, Iterator, Literal
+
+from . import metrics
+from .cachemaintenance import CacheMaintenance
+from .memorycache import MemoryCache
+from .ratelimit import RateLimiter
+
+API_URL = "https://api2.warera.io/trpc"
+
+# Size of the keep-alive connection pool and of the thread pool used by async requests
+MAX_CONNECTIONS = 10
 
-# Clearing of expired cache
 s = CachedSession("wareraapi_cache", use_temp=True, ignored_parameters=["X-API-KEY"])
-s.cache.delete(expired=True)
+s.mount("https://", HTTPAdapter(pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS))
 
 API_TOKEN = ""
 
-DELAY_SECONDS = 0.25
-BATCH_DELAY = 0.25
+# Optional fixed delays on top of the rate limiter, which paces requests by Ratelimit-* headers
+DELAY_SECONDS = 0
+BATCH_DELAY = 0
 BATCH_LIMIT = 100
+BATCH_RETRIES = 2
+
+# Log payloads of every request and saved cache entry at DEBUG level. Per-request messages are logged at DEBUG
+# level without payloads otherwise, and nothing is formatted unless the logger is enabled for the level
+DEBUG_TRACE = False
+
+limiter = RateLimiter()
+
+# Decoded responses, checked before the persistent cache
+memory_cache = MemoryCache(max_entries=4096)
+
+# Clearing of expired cache, see set_cache_maintenance()
+cache_maintenance = CacheMaintenance()
 
 logger = logging.getLogger(__name__)
 
+_executor: ThreadPoolExecutor | None = None
+
+# Requests that are being sent right now, see send_request()
+_in_flight: dict[tuple[str, str], Future] = {}
+_in_flight_lock = threading.Lock()
+
 
 class ResponseType(Enum):
     PAGINATED_LIST = "paginated_list"
@@ -35,17 +70,135 @@ class EndpointCall:
         self.cache_ttl: int = cache_tll
         self.response_type: ResponseType = response_type
 
-    def execute(self) -> dict | tuple[dict, str | None]:
-        response = send_request(endpoint=self.endpoint_path, data=self.payload, ttl=self.cache_ttl)["result"].get("data")
+    def execute(self, refresh: bool = False) -> dict | tuple[dict, str | None]:
+        """:param refresh: Send the request even if its response is cached"""
+        return self._parse(send_request(endpoint=self.endpoint_path, data=self.payload, ttl=self.cache_ttl,
+                                        refresh=refresh))
+
+    async def execute_async(self, refresh: bool = False) -> dict | tuple[dict, str | None]:
+        """Same as execute(), but awaitable. Many calls can be in flight at once, e.g. with asyncio.gather()"""
+        return self._parse(await send_request_async(endpoint=self.endpoint_path, data=self.payload, ttl=self.cache_ttl,
+                                                    refresh=refresh))
+
+    def with_cursor(self, cursor: str | None) -> "EndpointCall":
+        """Returns the same call for another page of a paginated endpoint"""
+        payload = {k: v for k, v in (self.payload or {}).items() if k != "cursor"}
+        if cursor:
+            payload["cursor"] = cursor
+        return EndpointCall(self.endpoint_path, cache_tll=self.cache_ttl, response_type=self.response_type, payload=payload)
+
+    def iter_pages(self, prefetch: bool = False, max_items: int | None = None,
+                   stop_when: Callable[[dict], bool] | None = None) -> Iterator[list[dict]]:
+        """Lazily follows cursors of a paginated endpoint and yields every page as a list of items
+        :param prefetch: Request the next page while the current one is being processed
+        :param max_items: Stop after this many items
+        :param stop_when: Stop at the first item for which this returns True, that item is not yielded
+        """
+        self._check_paginated()
+        trimmer = _PageTrimmer(max_items, stop_when)
+        next_page = None
+        call = self
+        try:
+            while True:
+                items, cursor = next_page.result() if next_page is not None else call.execute()
+                next_page = None
+                items, done = trimmer.trim(items or [])
+                if done or not cursor:
+                    if items:
+                        yield items
+                    return
+                call = call.with_cursor(cursor)
+                if prefetch:
+                    next_page = _get_executor().submit(call.execute)
+                yield items
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    def iter_items(self, prefetch: bool = False, max_items: int | None = None,
+                   stop_when: Callable[[dict], bool] | None = None) -> Iterator[dict]:
+        """Same as iter_pages(), but yields items one by one"""
+        for items in self.iter_pages(prefetch, max_items, stop_when):
+            yield from items
+
+    async def aiter_pages(self, prefetch: bool = False, max_items: int | None = None,
+                          stop_when: Callable[[dict], bool] | None = None) -> AsyncIterator[list[dict]]:
+        """Async version of iter_pages()"""
+        self._check_paginated()
+        trimmer = _PageTrimmer(max_items, stop_when)
+        next_page = None
+        call = self
+        try:
+            while True:
+                items, cursor = await (next_page if next_page is not None else call.execute_async())
+                next_page = None
+                items, done = trimmer.trim(items or [])
+                if done or not cursor:
+                    if items:
+                        yield items
+                    return
+                call = call.with_cursor(cursor)
+                if prefetch:
+                    next_page = asyncio.ensure_future(call.execute_async())
+                yield items
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def aiter_items(self, prefetch: bool = False, max_items: int | None = None,
+                          stop_when: Callable[[dict], bool] | None = None) -> AsyncIterator[dict]:
+        """Async version of iter_items()"""
+        async for items in self.aiter_pages(prefetch, max_items, stop_when):
+            for item in items:
+                yield item
+
+    def _check_paginated(self):
+        if self.response_type != ResponseType.PAGINATED_LIST:
+            raise WarEraApiException(f"{self.endpoint_path} is not a paginated endpoint")
+
+    def _parse(self, raw_response: dict) -> dict | tuple[dict, str | None]:
+        response = raw_response["result"].get("data")
         if self.response_type == ResponseType.REGULAR:
             return response
         elif self.response_type == ResponseType.PAGINATED_LIST:
             return response.get("items"), response.get("nextCursor")
 
 
+class _PageTrimmer:
+    """Applies max_items and stop_when limits of EndpointCall.iter_pages() to consecutive pages"""
+
+    def __init__(self, max_items: int | None, stop_when: Callable[[dict], bool] | None):
+        self.left: int | None = max_items
+        self.stop_when = stop_when
+
+    def trim(self, items: list[dict]) -> tuple[list[dict], bool]:
+        """:return: Tuple(items to yield, whether iteration should stop after them)"""
+        done = False
+        if self.stop_when is not None:
+            for index, item in enumerate(items):
+                if self.stop_when(item):
+                    items, done = items[:index], True
+                    break
+        if self.left is not None:
+            if len(items) >= self.left:
+                items, done = items[:self.left], True
+            self.left -= len(items)
+        return items, done
+
+
 class BatchSession:
-    def __init__(self, cache_ttl=600):
+    def __init__(self, cache_ttl=600, workers: int | None = None, chunk_retries: int = BATCH_RETRIES, use_cache: bool = True):
+        """
+        :param workers: How many chunks of BATCH_LIMIT endpoints are sent at once. By default chunks are sent
+        one by one by send_batch() and up to MAX_CONNECTIONS at once by send_batch_async()
+        :param chunk_retries: How many times a failed chunk is resent. Chunks that succeeded are never resent
+        :param use_cache: Take responses that are already cached from the cache and send only the rest.
+        If False, everything is sent to the API and only the fresh responses are cached
+        """
         self.cache_ttl = cache_ttl
+        self.workers = workers
+        self.chunk_retries = chunk_retries
+        self.use_cache = use_cache
         self.responses = None
         self.batched_endpoints = []
         self.batched_payload = []
@@ -57,35 +210,113 @@ class BatchSession:
         if exc_type is None:
             self.responses = self.send_batch(self.cache_ttl)
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.responses = await self.send_batch_async(self.cache_ttl)
+
     def add(self, batched_endpoint: EndpointCall):
         # These two lists should always be synchronized
         self.batched_endpoints.append((batched_endpoint.endpoint_path, batched_endpoint.cache_ttl))
         self.batched_payload.append(batched_endpoint.payload)
 
     def send_batch(self, ttl=600):
-        """This method splits and sends batched requests, as well as returns and caches batched responses"""
-        batch_limit = BATCH_LIMIT or 9999
-        cycle, max_cycle = 0, math.ceil(len(self.batched_endpoints) / batch_limit)  # How much batches to prepare
-        responses = []
-        while cycle < max_cycle:
-            # /endpoints,endpoint,endpoint?batch=1?input=<payload>
-            endpoints_str = "/" + ",".join(
-                ep[1:] for ep, _ in self.batched_endpoints[cycle * batch_limit:(cycle + 1) * batch_limit])
-            # Input of endpoints
-            input_payload = {str(i): p for i, p in
-                             enumerate(self.batched_payload[cycle * batch_limit:(cycle + 1) * batch_limit])}
-            responses.extend(send_request(f"{endpoints_str}?batch=1", data=input_payload, ttl=ttl))
-            if not cycle + 1 == max_cycle:
-                cycle += 1
-                time.sleep(BATCH_DELAY)
+        """This method splits and sends batched requests, as well as returns and caches batched responses.
+        :param ttl: Not used anymore, every response is cached with TTL of its endpoint"""
+        responses, chunks, duplicates = self._split()
+        workers = self.workers or 1
+        if workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wareraapi-batch") as executor:
+                results = list(executor.map(self._send_chunk, chunks))
+        else:
+            results = []
+            for cycle, chunk in enumerate(chunks):
+                if cycle and BATCH_DELAY:
+                    time.sleep(BATCH_DELAY)
+                results.append(self._send_chunk(chunk))
+        return self._finish(responses, chunks, results, duplicates)
+
+    async def send_batch_async(self, ttl=600):
+        """Same as send_batch(), but awaitable"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.workers or MAX_CONNECTIONS)
+
+        async def send(chunk):
+            async with semaphore:
+                return await loop.run_in_executor(_get_executor(), self._send_chunk, chunk)
+
+        responses, chunks, duplicates = self._split()
+        return self._finish(responses, chunks, await asyncio.gather(*(send(chunk) for chunk in chunks)), duplicates)
+
+    def _split(self) -> tuple[list, list[list[int]], dict[int, int]]:
+        """Resolves batched endpoints against the cache and drops duplicated endpoints
+        :return: Tuple(responses with None for every cache miss, indexes of misses split in chunks of BATCH_LIMIT,
+        Dict{index of duplicate: index of the same endpoint that will be sent})"""
+        responses = [None] * len(self.batched_endpoints)
+        misses = []
+        duplicates = {}
+        unique = {}
+        for index, (endpoint, _) in enumerate(self.batched_endpoints):
+            key = MemoryCache.make_key(endpoint, self.batched_payload[index])
+            if key in unique:
+                duplicates[index] = unique[key]
                 continue
-            break
+            unique[key] = index
+            cached = get_cached_response(endpoint, self.batched_payload[index]) if self.use_cache else None
+            if cached is None:
+                misses.append(index)
+            else:
+                responses[index] = cached
+            if self.use_cache:
+                metrics.record("cache_miss" if cached is None else "cache_hit", _metrics_name(endpoint))
+        if len(misses) + len(duplicates) < len(responses):
+            logger.info("%s of %s batched requests were found in cache", len(responses) - len(misses) - len(duplicates),
+                        len(responses))
+        if duplicates:
+            logger.info("%s duplicated batched requests won't be sent", len(duplicates))
+        batch_limit = BATCH_LIMIT or 9999
+        max_cycle = math.ceil(len(misses) / batch_limit)  # How much batches to prepare
+        return responses, [misses[cycle * batch_limit:(cycle + 1) * batch_limit] for cycle in range(max_cycle)], duplicates
+
+    def _send_chunk(self, indexes: list[int]) -> list:
+        """Sends one chunk, retrying it on failure, and caches its responses as soon as they arrive"""
+        # /endpoints,endpoint,endpoint?batch=1?input=<payload>
+        endpoints_str = "/" + ",".join(self.batched_endpoints[index][0][1:] for index in indexes)
+        # Input of endpoints
+        input_payload = {str(i): self.batched_payload[index] for i, index in enumerate(indexes)}
+        chunk_name = f"{indexes[0]}-{indexes[-1]}"
+        metrics.record("batch_size", "batch", len(indexes))
+        attempt = 0
+        while True:
+            try:
+                # The batch itself is never cached, save_cache_bulk() caches its successful items one by one
+                responses = send_request(f"{endpoints_str}?batch=1", data=input_payload, ttl=0)
+                if not isinstance(responses, list) or len(responses) != len(indexes):
+                    raise WarEraApiException(f"Expected {len(indexes)} responses in a batch")
+                break
+            except WarEraApiException as e:
+                if attempt >= self.chunk_retries:
+                    raise WarEraApiException(f"Batch chunk {chunk_name} failed after {attempt + 1} attempts") from e
+                attempt += 1
+                logger.warning("Batch chunk %s failed: %s. Retry %s/%s", chunk_name, e, attempt, self.chunk_retries)
+                metrics.record("retry", "batch")
+                metrics.record("wait", "batch", attempt)
+                time.sleep(attempt)
 
         # Here we cache every response from a batch in case something will be requested independently
-        for index, response in enumerate(responses):
-            save_cache_manually(self.batched_endpoints[index][0], self.batched_payload[index], response,
-                                self.batched_endpoints[index][1])
+        save_cache_bulk([(self.batched_endpoints[index][0], self.batched_payload[index], response,
+                          self.batched_endpoints[index][1]) for index, response in zip(indexes, responses)])
+        return responses
 
+    def _finish(self, responses: list, chunks: list[list[int]], results: list[list], duplicates: dict[int, int]) -> list:
+        """Merges responses of sent chunks with cached responses, keeping the order in which endpoints were added"""
+        for indexes, chunk_responses in zip(chunks, results):
+            for index, response in zip(indexes, chunk_responses):
+                responses[index] = response
+        for index, original in duplicates.items():
+            responses[index] = responses[original]
         self.batched_endpoints.clear()
         self.batched_payload.clear()
         return responses
@@ -99,95 +330,284 @@ def update_api_token(new_api_token):
     API_TOKEN = new_api_token
 
 
-def send_request(endpoint, data=None, ttl=0) -> dict | list:
-    s.cache.delete(expired=True)  # clearing of expired cache every time request is being prepared
-    url = f"https://api2.warera.io/trpc{endpoint}"
+def set_max_connections(max_connections: int):
+    """Resizes the keep-alive connection pool and the number of requests that can be in flight at once"""
+    global MAX_CONNECTIONS, _executor
+    MAX_CONNECTIONS = max(1, max_connections)
+    s.mount("https://", HTTPAdapter(pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS))
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def mount_transport(adapter: BaseAdapter | None):
+    """Sends all API requests through the adapter, e.g. transport.ReplayTransport for offline benchmarks.
+    None goes back to the network"""
+    if adapter is None:
+        s.adapters.pop(API_URL, None)
+    else:
+        s.mount(API_URL, adapter)
+
+
+def configure_cache(backend: BaseCache | Literal["sqlite", "filesystem", "redis", "memory"] = "sqlite",
+                    cache_name: str = "wareraapi_cache", **kwargs):
+    """Replaces the persistent cache, e.g. with one shared by all worker processes and hosts, so that every response
+    (batched ones included) is requested from the API only once:
+
+    configure_cache("sqlite", "/shared/wareraapi_cache.sqlite")  # Processes of one host, in WAL mode
+    configure_cache("redis", connection=Redis(host="cache"))  # Every host, requires redis to be installed
+    configure_cache(KeyValueCache(store))  # Any mapping-like key-value store, see cachebackend.py
+
+    Entries of the old cache are not copied to the new one.
+    :param backend: requests-cache backend instance, or name of the backend
+    :param cache_name: Path of the SQLite file, directory of the filesystem cache or namespace in Redis.
+    Relative paths are in the temp directory
+    :param kwargs: Passed to the requests-cache backend, e.g. busy_timeout of SQLite"""
+    if backend in ("sqlite", "filesystem"):
+        kwargs.setdefault("use_temp", True)
+    if backend == "sqlite":
+        # Readers of other processes don't block the writer and the other way round
+        kwargs.setdefault("wal", True)
+    cache = backend if isinstance(backend, BaseCache) else init_backend(cache_name, backend, **kwargs)
+    old_cache = s.cache
+    settings = s.settings
+    s.cache = cache
+    s.settings = settings
+    if old_cache is not cache:
+        old_cache.close()
+    # Keys are created by the backend, and decoded responses may not be in the new cache
+    _cache_key_of_input.cache_clear()
+    memory_cache.clear()
+
+
+def set_cache_maintenance(policy: CacheMaintenance):
+    """Replaces the policy of clearing expired cache, e.g. CacheMaintenance(sweep_every=None, sweep_interval=300, max_entries=100_000)"""
+    global cache_maintenance
+    cache_maintenance.stop()
+    cache_maintenance = policy
+    cache_maintenance.start(lambda: s.cache)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="wareraapi")
+    return _executor
+
+
+def _headers() -> dict:
+    return {
+        "X-API-Key": API_TOKEN,
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
+        "Accept": "application/json"
+    }
+
+
+def _prepare_request(endpoint: str, data: dict | None) -> PreparedRequest:
+    request = PreparedRequest()
+    request.prepare(
+        method="GET",
+        url=f"{API_URL}{endpoint}",
+        headers=_headers(),
+        params={"input": json.dumps(data)} if data else None
+    )
+    return request
+
+
+def _cache_key(endpoint: str, data: dict | None) -> str:
+    """Key of the request in the persistent cache"""
+    return _cache_key_of_input(endpoint, json.dumps(data) if data else None)
+
+
+@functools.lru_cache(maxsize=16384)
+def _cache_key_of_input(endpoint: str, input_json: str | None) -> str:
+    # Creating a key normalizes the whole URL, which costs more than a cache lookup itself
+    request = PreparedRequest()
+    request.prepare(method="GET", url=f"{API_URL}{endpoint}", headers=_headers(),
+                    params={"input": input_json} if input_json else None)
+    return s.cache.create_key(request)
+
+
+def _get_persistent_cache(key: str):
+    """Returns not expired CachedResponse with the key from the persistent cache or None"""
+    cached_response = s.cache.get_response(key)
+    if cached_response and not cached_response.is_expired:
+        return cached_response
+    return None
+
+
+def get_cached_response(endpoint: str, data: dict = None) -> dict | list | None:
+    """Returns decoded response from the cache without sending any request, None if it isn't cached"""
+    memory_key = MemoryCache.make_key(endpoint, data)
+    memory_cached = memory_cache.get(memory_key)
+    if memory_cached is not None:
+        return memory_cached
+    cached_response = _get_persistent_cache(_cache_key(endpoint, data))
+    if cached_response is None:
+        return None
+    logger.debug("Found request to %s in cache, no request created", endpoint)
+    return_data = cached_response.json()
+    memory_cache.set(memory_key, return_data, cached_response.expires_delta or 0)
+    return return_data
+
+
+def send_request(endpoint, data=None, ttl=0, refresh=False) -> dict | list:
+    """:param refresh: Send the request even if its response is cached, the fresh response replaces the cached one.
+    Nothing is cached with TTL 0, so such requests always go to the API"""
+    refresh = refresh or not ttl
+    return_data = get_cached_response(endpoint, data) if not refresh else None
+    if not refresh:
+        metrics.record("cache_miss" if return_data is None else "cache_hit", _metrics_name(endpoint))
+    if return_data is not None:
+        return return_data
+    # Identical requests sent at the same time from different threads share one network request
+    key = MemoryCache.make_key(endpoint, data)
+    with _in_flight_lock:
+        in_flight = _in_flight.get(key)
+        is_leader = in_flight is None
+        if is_leader:
+            in_flight = _in_flight[key] = Future()
+    if not is_leader:
+        logger.debug("Identical request to %s is already in flight, waiting for its response", endpoint)
+        return in_flight.result()
+    try:
+        return_data = _fetch(endpoint, data, ttl, refresh)
+    except BaseException as e:
+        in_flight.set_exception(e)
+        raise
+    else:
+        in_flight.set_result(return_data)
+        return return_data
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def _fetch(endpoint, data=None, ttl=0, refresh=False) -> dict | list:
+    """Sends request to the API without checking the cache or requests in flight first.
+    Persistent cache can still answer it, unless refresh is True"""
+    cache_maintenance.on_request(s.cache)
+    url = f"{API_URL}{endpoint}"
     params = {"input": json.dumps(data)} if data else None
-    logger.info(f"Creating request: {url} with params {params}")
-    cached_response = s.cache.get_response(
-        s.cache.create_key(requests.Request(
-            method="GET",
-            url=url,
-            params=params,
-            headers={
-                "X-API-Key":API_TOKEN,
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
-                "Accept": "application/json"
-            }
-        ).prepare()), False)
-    if cached_response:
-        logger.info(f"Found request in cache, no request created")
-        return cached_response.json()
-    time.sleep(DELAY_SECONDS)
+    if DEBUG_TRACE:
+        logger.debug("Creating request: %s with params %s", url, params)
+    else:
+        logger.debug("Creating request: %s", url)
+    name = _metrics_name(endpoint)
+    waited = limiter.acquire(DELAY_SECONDS)
+    if waited:
+        metrics.record("wait", name, waited)
+    start = time.perf_counter()
     try:
         r = s.get(
             url=url,
             expire_after=ttl,
+            force_refresh=refresh,
             params=params,
-            headers={
-                "X-API-Key": API_TOKEN,
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
-                "Accept": "application/json"
-            }
+            headers=_headers()
         )
     except RequestException as e:
         logger.error("Request failed")
+        metrics.record("error", name)
         raise WarEraApiException("Request failed") from e
+    if not getattr(r, "from_cache", False):
+        limiter.update(r.headers, r.status_code)
+        metrics.record("request", name)
+        metrics.record("latency", name, time.perf_counter() - start)
+        metrics.record("bytes", name, len(r.content))
     try:
         return_data = r.json()
     except (ValueError, json.JSONDecodeError) as e:
         logger.error("Bad JSON in response")
+        metrics.record("error", name)
+        # Otherwise the broken response would be served from the cache until it expires
+        if getattr(r, "cache_key", None):
+            s.cache.delete(r.cache_key)
         raise WarEraApiException("Bad JSON in response") from e
     if 200 <= r.status_code <= 299:
-        logger.info("Success!")
+        logger.debug("Success!")
+        memory_cache.set(MemoryCache.make_key(endpoint, data), return_data, ttl)
         return return_data
     elif r.status_code == 429:
+        metrics.record("rate_limited", name)
         limits_reset = int(r.headers.get('Ratelimit-Reset', 60)) + 1
-        logger.warning(f"API returned 429: Too much requests. Retrying in: {limits_reset}")
-        time.sleep(limits_reset)
-        return send_request(endpoint, data, ttl)
+        logger.warning("API returned 429: Too much requests. Retrying in: %s", limits_reset)
+        return _fetch(endpoint, data, ttl, refresh)  # The limiter holds the retry until limits are reset
     elif r.status_code == 401 and return_data.get("error", {}).get("message", False) == "API token required":
-        logger.error(f"Please specify api-token with wareraapi.update_api_token(<YOUR_TOKEN>)")
-    logger.error(f"{r.status_code}: {r.reason}")
+        logger.error("Please specify api-token with wareraapi.update_api_token(<YOUR_TOKEN>)")
+    logger.error("%s: %s", r.status_code, r.reason)
+    metrics.record("error", name)
     raise WarEraApiException(f"{r.status_code}: {r.reason}")
 
 
+def _metrics_name(endpoint: str) -> str:
+    """Name of the endpoint in metrics, all batches are counted together"""
+    return "batch" if endpoint.endswith("?batch=1") else endpoint.lstrip("/")
+
+
+async def send_request_async(endpoint, data=None, ttl=0, refresh=False) -> dict | list:
+    """Awaitable send_request(). Requests share the pooled session (and its cache) and run on a thread pool
+    of MAX_CONNECTIONS workers, so the event loop is never blocked by network I/O or delays"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), send_request, endpoint, data, ttl, refresh)
+
+
 def save_cache_manually(endpoint: str, params: dict, data: dict, ttl: int):
-    logger.info(f"Saving cache for endpoint {endpoint}, params {params}, ttl {ttl}")
+    if DEBUG_TRACE:
+        logger.debug("Saving cache for endpoint %s, params %s, ttl %s", endpoint, params, ttl)
     # We need that fake response to search for it (or store it) in the cache via requests_cache module
-    fake_req = requests.PreparedRequest()
-    fake_req.prepare(
-        method="GET",
-        url=f"https://api2.warera.io/trpc{endpoint}",
-        headers={
-            "X-API-Key": API_TOKEN,
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
-            "Accept": "application/json"
-        },
-        params={"input": json.dumps(params)} if params else None
-    )
+    key = _cache_key(endpoint, params)
+    memory_cache.set(MemoryCache.make_key(endpoint, params), data, ttl)
     # If already cached and not expired then do nothing
-    if s.cache.contains(request=fake_req):
-        logger.info("Tried to create a manual cache from batch, but data is already cached. Terminated")
+    if _get_persistent_cache(key) is not None:
+        logger.debug("Tried to create a manual cache from batch, but data is already cached. Terminated")
         return False
 
-    fake_resp = Response()
-    fake_resp.status_code = 200
-    fake_resp._content = json.dumps(data).encode("utf-8")
-    fake_resp.headers["Content-Type"] = "application/json"
-    fake_resp.request = fake_req
-    fake_resp.url = fake_req.url
+    expire_date = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=ttl)
+    s.cache.save_response(response=_fake_response(_prepare_request(endpoint, params), data), cache_key=key,
+                          expires=expire_date)
+    logger.debug("Succesfully created manual cache for %s", endpoint)
+
+
+def save_cache_bulk(entries: list[tuple[str, dict, dict, int]]):
+    """Same as save_cache_manually() for many responses at once, e.g. all responses of a batch.
+    Entries are written in one transaction (if the cache backend supports it) and are not checked against
+    the cache first: they are at least as fresh as anything cached. Errors of batched endpoints are not cached,
+    so that they are sent again next time
+    :param entries: List[Tuple(endpoint, params, data, ttl)]"""
+    now = datetime.datetime.now(datetime.UTC)
+    cache = s.cache
+    bulk_commit = getattr(cache.responses, "bulk_commit", None)
+    saved = 0
+    with bulk_commit() if bulk_commit is not None else contextlib.nullcontext():
+        for endpoint, params, data, ttl in entries:
+            if not isinstance(data, dict) or "result" not in data:
+                continue
+            saved += 1
+            memory_cache.set(MemoryCache.make_key(endpoint, params), data, ttl)
+            if ttl <= 0:
+                continue
+            cache.save_response(response=_fake_response(_prepare_request(endpoint, params), data),
+                                cache_key=_cache_key(endpoint, params), expires=now + datetime.timedelta(seconds=ttl))
+    logger.debug("Saved %s of %s responses to the cache", saved, len(entries))
 
-    class FakeRaw:
-        def __init__(self, url):
-            self._request_url = url
 
-    fake_resp.raw = FakeRaw(fake_req.url)
+class _FakeRaw:
+    def __init__(self, url):
+        self._request_url = url
 
-    expire_date = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=ttl)
 
-    s.cache.save_response(response=fake_resp, expires=expire_date)
-    logger.info("Succesfully created manual cache")
+def _fake_response(request: PreparedRequest, data) -> Response:
+    """Response with the data, as if it was returned for the request. Decoded data has to be encoded again,
+    as only the whole batch was received as bytes"""
+    fake_resp = Response()
+    fake_resp.status_code = 200
+    fake_resp._content = json.dumps(data).encode("utf-8")
+    fake_resp.headers["Content-Type"] = "application/json"
+    fake_resp.request = request
+    fake_resp.url = request.url
+    fake_resp.raw = _FakeRaw(request.url)
+    return fake_resp
 
 
 def clean(dictionary: dict) -> dict:  # This method was made with ChatGPT :( Shame on me
@@ -453,9 +873,7 @@ def user_get_user_lite(user_id: str) -> EndpointCall:
     payload = {
         "userId": user_id
     }
-    return EndpointCall(endpoint_path="/user.getUserLite",
-                        payload=payload,
-                        response_type=ResponseType.PAGINATED_LIST)
+    return EndpointCall(endpoint_path="/user.getUserLite", payload=payload)
 
 
 def user_get_users_by_country(country_id: str, limit: int = 10, cursor: str = None) -> EndpointCall: